@@ -1,4 +1,6 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class AccountsConfig(AppConfig):
@@ -6,4 +8,12 @@ class AccountsConfig(AppConfig):
     name = 'accounts'
 
     def ready(self):
-        pass
+        from core.caching import cache_is_shared
+        from . import signals  # noqa: F401
+
+        # Role changes and deactivations reach the other workers through the cache only
+        if settings.JWT_CLAIMS_AUTH and not settings.DEBUG and not cache_is_shared():
+            raise ImproperlyConfigured(
+                'JWT_CLAIMS_AUTH needs a cache shared by all workers (Redis or Memcached); '
+                'set CACHE_BACKEND/CACHE_LOCATION or turn JWT_CLAIMS_AUTH off.'
+            )
@@ -0,0 +1,128 @@
+"""
+Optional JWT authentication that answers permission checks from token claims.
+
+Access tokens carry the user's role and active flag (see
+RoleTokenObtainPairSerializer). ClaimsJWTAuthentication returns a lazy user
+that serves `id`, `role` and `is_active` straight from those claims and only
+loads the full row, through a short-TTL cache, when something else is read.
+
+Claims can go stale when a role changes or a user is deactivated before the
+token expires. Every User save therefore writes the current state to the
+cache for the lifetime of an access token, and that entry wins over the claims.
+The cache has to be shared by every worker for this to work (see AccountsConfig).
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import LazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+ROLE_CLAIM = 'role'
+ACTIVE_CLAIM = 'is_active'
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _state_key(user_id):
+    return f'auth:user-state:{user_id}'
+
+
+def user_cache_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 30)
+
+
+def remember_user_state(user):
+    """Record a user's current role/active flag so stale token claims are overridden."""
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(_state_key(user.pk), {'role': user.role, 'is_active': user.is_active}, timeout)
+    cache.delete(_user_key(user.pk))
+
+
+def forget_user(user_id):
+    """Treat a deleted user as inactive for as long as their tokens may live."""
+    timeout = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+    cache.set(_state_key(user_id), {'role': None, 'is_active': False}, timeout)
+    cache.delete(_user_key(user_id))
+
+
+def load_user(user_id):
+    """Fetch the full user row through the short-TTL user cache."""
+    key = _user_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        User = get_user_model()
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        cache.set(key, user, user_cache_timeout())
+    return user
+
+
+class ClaimsUser(LazyObject):
+    """A user whose identity and role come from the token.
+
+    Any attribute other than the ones below loads the real User, so views can
+    keep treating request.user as a model instance (including FK assignment).
+    """
+
+    def __init__(self, user_id, role, is_active):
+        self.__dict__['_claims'] = {'id': user_id, 'role': role, 'is_active': is_active}
+        super().__init__()
+
+    def _setup(self):
+        self._wrapped = load_user(self.__dict__['_claims']['id'])
+
+    @property
+    def id(self):
+        return self.__dict__['_claims']['id']
+
+    pk = id
+
+    @property
+    def role(self):
+        return self.__dict__['_claims']['role']
+
+    @property
+    def is_active(self):
+        return self.__dict__['_claims']['is_active']
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that avoids the per-request user query.
+
+    Tokens issued before the role claim existed fall back to the regular
+    database lookup.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        # simplejwt stores the id as a string claim
+        user_id = get_user_model()._meta.pk.to_python(user_id)
+
+        state = cache.get(_state_key(user_id)) or {
+            'role': validated_token[ROLE_CLAIM],
+            'is_active': validated_token.get(ACTIVE_CLAIM, True),
+        }
+        if api_settings.CHECK_USER_IS_ACTIVE and not state['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        return ClaimsUser(user_id, state['role'], state['is_active'])
@@ -0,0 +1,145 @@
+"""
+Profile picture processing: validation and resized, metadata-free variants.
+
+Originals are kept as uploaded. Variants are written next to them under
+profile_pictures/variants/ and recorded on User.profile_picture_variants, which
+the serializers turn into responsive URLs.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+MIN_DIMENSION = 32
+MAX_DIMENSION = 6000
+MAX_PIXELS = 40_000_000
+
+# Longest edge in pixels for each variant
+VARIANT_SIZES = {
+    'thumbnail': 128,
+    'card': 400,
+    'full': 1200,
+}
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='profile-images')
+
+
+def validate_image_dimensions(file):
+    """Reject images that are too small, too large or decompression bombs."""
+    position = file.tell() if hasattr(file, 'tell') else None
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+    except Exception:
+        raise serializers.ValidationError('Upload a valid image.')
+    finally:
+        if position is not None:
+            file.seek(position)
+
+    if width < MIN_DIMENSION or height < MIN_DIMENSION:
+        raise serializers.ValidationError(
+            f'Image must be at least {MIN_DIMENSION}x{MIN_DIMENSION} pixels.'
+        )
+    if width > MAX_DIMENSION or height > MAX_DIMENSION or width * height > MAX_PIXELS:
+        raise serializers.ValidationError(
+            f'Image must be at most {MAX_DIMENSION}x{MAX_DIMENSION} pixels.'
+        )
+
+
+def variant_name(source_name, size_name, extension):
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    return f'profile_pictures/variants/{stem}_{size_name}.{extension}'
+
+
+def render_variants(source_name):
+    """Write every size/format variant of an image and return their storage names.
+
+    Re-encoding through Pillow drops EXIF, ICC and other metadata; orientation
+    is applied to the pixels first so rotated phone photos stay upright.
+    """
+    with default_storage.open(source_name, 'rb') as f:
+        with Image.open(f) as image:
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    variants = {}
+    for size_name, edge in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        variants[size_name] = {}
+        for extension, (pil_format, options) in VARIANT_FORMATS.items():
+            if pil_format == 'JPEG' or not has_alpha:
+                encoded = resized.convert('RGB')
+            else:
+                encoded = resized.convert('RGBA')
+            buffer = io.BytesIO()
+            encoded.save(buffer, pil_format, **options)
+
+            name = variant_name(source_name, size_name, extension)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            variants[size_name][extension] = default_storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def delete_variants(variants):
+    for size_name, formats in (variants or {}).items():
+        if not isinstance(formats, dict):
+            continue
+        for name in formats.values():
+            try:
+                default_storage.delete(name)
+            except Exception:
+                logger.warning('Could not delete profile picture variant %s', name)
+
+
+def generate_variants(user_id, source_name):
+    """Build the variants for a user's picture, unless it changed in the meantime."""
+    from .models import User
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or user.profile_picture.name != source_name:
+        return
+
+    previous = user.profile_picture_variants
+    variants = render_variants(source_name)
+    variants['source'] = source_name
+    user.profile_picture_variants = variants
+    user.save(update_fields=['profile_picture_variants'])
+
+    if previous and previous.get('source') != source_name:
+        delete_variants(previous)
+    logger.info('Generated profile picture variants for user %s', user_id)
+
+
+def _generate_in_background(user_id, source_name):
+    close_old_connections()
+    try:
+        generate_variants(user_id, source_name)
+    except Exception:
+        logger.exception('Failed to generate profile picture variants for user %s', user_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(user):
+    """Queue variant generation once the current transaction commits."""
+    user_id, source_name = user.pk, user.profile_picture.name
+    if getattr(settings, 'PROFILE_PICTURE_VARIANTS_ASYNC', True):
+        transaction.on_commit(lambda: _executor.submit(_generate_in_background, user_id, source_name))
+    else:
+        transaction.on_commit(lambda: generate_variants(user_id, source_name))
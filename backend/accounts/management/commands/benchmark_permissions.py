@@ -0,0 +1,124 @@
+import json
+import platform
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.permissions import BasePermission
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+
+from accounts.models import User
+from accounts.permissions import Capability, get_capabilities, require
+
+
+class LegacyCanManageEmails(BasePermission):
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        return request.user.role in ['ADMIN', 'PRESIDENT', 'BOARD']
+
+
+class LegacyCanViewSubscribers(BasePermission):
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        return hasattr(request.user, 'role') and request.user.role in ['ADMIN', 'PRESIDENT', 'BOARD']
+
+
+class LegacyCanDeleteSubscribers(BasePermission):
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        return hasattr(request.user, 'role') and request.user.role in ['ADMIN', 'PRESIDENT']
+
+
+class LegacyCanModerateEmails(BasePermission):
+    def has_permission(self, request, view):
+        return request.user.role in ['ADMIN', 'PRESIDENT']
+
+
+class LegacyCanManageUsers(BasePermission):
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.role == 'ADMIN') or \
+            bool(request.user and request.user.role == 'PRESIDENT')
+
+
+# The role checks the views ran before the capability table, one per permission class
+LEGACY_CHECKS = [
+    LegacyCanManageEmails(),
+    LegacyCanViewSubscribers(),
+    LegacyCanDeleteSubscribers(),
+    LegacyCanModerateEmails(),
+    LegacyCanManageUsers(),
+]
+
+
+def legacy_checks(request):
+    return tuple(check.has_permission(request, None) for check in LEGACY_CHECKS)
+
+
+CHECKS = [
+    require(Capability.EMAILS_MANAGE)(),
+    require(Capability.SUBSCRIBERS_VIEW)(),
+    require(Capability.SUBSCRIBERS_DELETE)(),
+    require(Capability.EMAILS_MODERATE_ANY)(),
+    require(Capability.USERS_MANAGE)(),
+]
+
+
+def capability_checks(request):
+    return tuple(check.has_permission(request, None) for check in CHECKS)
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of permission checks and write JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100000, help='Simulated requests per role')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        results = {
+            'benchmark': 'permissions',
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'checks_per_request': len(CHECKS),
+            'roles': {},
+        }
+
+        for role in ('ADMIN', 'PRESIDENT', 'BOARD'):
+            user = User(pk=1, username=f'bench-{role.lower()}', role=role)
+            raw = factory.get('/api/emails/')
+            force_authenticate(raw, user=user)
+            request = APIView().initialize_request(raw)
+            request.user  # authenticate once, as DRF does before permission checks
+
+            if legacy_checks(request) != capability_checks(request):
+                self.stdout.write(self.style.WARNING(f'Legacy and capability checks disagree for {role}'))
+
+            results['roles'][role] = {
+                'legacy_ns_per_request': self._time(legacy_checks, request, options['requests']),
+                'capability_ns_per_request': self._time(capability_checks, request, options['requests']),
+                'capability_resolve_ns': self._time(self._resolve_uncached, request, options['requests']),
+            }
+
+        rendered = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(rendered + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
+
+    def _resolve_uncached(self, request):
+        # Cost of the first lookup in a request, before the set is cached
+        request._capabilities = None
+        return get_capabilities(request)
+
+    def _time(self, fn, request, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(request)
+        return round((time.perf_counter() - start) / iterations * 1e9, 1)
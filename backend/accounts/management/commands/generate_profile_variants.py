@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from accounts.images import generate_variants
+from accounts.models import User
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for profile pictures that lack them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate variants even if they are up to date')
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+        generated = 0
+        for user in users:
+            if not options['force'] and user.profile_picture_variants.get('source') == user.profile_picture.name:
+                continue
+            try:
+                generate_variants(user.pk, user.profile_picture.name)
+                generated += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error processing {user.username}: {str(e)}'))
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {generated} users'))
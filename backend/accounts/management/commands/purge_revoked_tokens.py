@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from accounts.revocation import purge_expired
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have expired (run periodically, e.g. daily from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {deleted} expired revoked tokens'))
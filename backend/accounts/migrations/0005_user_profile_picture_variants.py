@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_user_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict, help_text='Resized copies of the profile picture by size and format'),
+        ),
+    ]
@@ -19,6 +19,7 @@ class User(AbstractUser):
     major = models.CharField(max_length=100, blank=True)
     description = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, help_text="Resized copies of the profile picture by size and format")
     title = models.CharField(max_length=100, blank=True, help_text="Position/Title in the organization")
     email = models.EmailField(unique=True)
     is_main = models.BooleanField(default=False, help_text="Whether this user should be displayed on the main page")
@@ -31,3 +32,11 @@ class User(AbstractUser):
 
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
+
+class RevokedToken(models.Model):
+    """A refresh token that may no longer be used, identified by its jti claim."""
+    jti = models.CharField(max_length=255, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -1,13 +1,113 @@
+"""
+Role based permissions.
+
+Every role maps to a precomputed frozenset of capabilities. A request resolves
+its user's set once and caches it on the request, so each check afterwards is a
+single set membership test. Views ask for capabilities, never for roles.
+"""
 from rest_framework import permissions
 
-class IsAdmin(permissions.BasePermission):
-    def has_permission(self, request, view):
-        return request.user and request.user.role == 'ADMIN'
 
-class IsPresident(permissions.BasePermission):
-    def has_permission(self, request, view):
-        return request.user and request.user.role == 'PRESIDENT'
+class Capability:
+    BOARD_ACCESS = 'board.access'
+    USERS_MANAGE = 'users.manage'
+    USERS_ASSIGN_ROLES = 'users.assign_roles'
+    EVENTS_CREATE = 'events.create'
+    EVENTS_EDIT = 'events.edit'
+    EVENTS_VIEW_INACTIVE = 'events.view_inactive'
+    ARTICLES_VIEW_UNPUBLISHED = 'articles.view_unpublished'
+    SUBSCRIBERS_VIEW = 'subscribers.view'
+    SUBSCRIBERS_DELETE = 'subscribers.delete'
+    EMAILS_MANAGE = 'emails.manage'
+    EMAILS_MODERATE_ANY = 'emails.moderate_any'
+    METRICS_VIEW = 'metrics.view'
+
+
+_BOARD = frozenset({
+    Capability.BOARD_ACCESS,
+    Capability.EVENTS_CREATE,
+    Capability.EVENTS_VIEW_INACTIVE,
+    Capability.ARTICLES_VIEW_UNPUBLISHED,
+    Capability.SUBSCRIBERS_VIEW,
+    Capability.EMAILS_MANAGE,
+})
+_PRESIDENT = _BOARD | {
+    Capability.USERS_MANAGE,
+    Capability.EVENTS_EDIT,
+    Capability.SUBSCRIBERS_DELETE,
+    Capability.EMAILS_MODERATE_ANY,
+}
+_ADMIN = _PRESIDENT | {
+    Capability.USERS_ASSIGN_ROLES,
+    Capability.METRICS_VIEW,
+}
+
+ROLE_CAPABILITIES = {
+    'ADMIN': _ADMIN,
+    'PRESIDENT': _PRESIDENT,
+    'BOARD': _BOARD,
+}
+NO_CAPABILITIES = frozenset()
+
+
+def capabilities_for(user):
+    if user is None or not user.is_authenticated or not getattr(user, 'is_active', True):
+        return NO_CAPABILITIES
+    return ROLE_CAPABILITIES.get(getattr(user, 'role', None), NO_CAPABILITIES)
+
+
+def get_capabilities(request):
+    """The capability set of the request's user, resolved once per request."""
+    user = getattr(request, 'user', None)
+    cached = getattr(request, '_capabilities', None)
+    if cached is None or cached[0] is not user:
+        cached = (user, capabilities_for(user))
+        request._capabilities = cached
+    return cached[1]
+
+
+def has_capability(request, capability):
+    return capability in get_capabilities(request)
+
+
+class HasCapability(permissions.BasePermission):
+    """Grant access when the user's role has `capability`.
+
+    `object_capability`, when set, is additionally required for unsafe methods
+    on a single object.
+    """
+    capability = None
+    object_capability = None
 
-class IsBoardOrHigher(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user and request.user.role in ['ADMIN', 'PRESIDENT', 'BOARD'] 
\ No newline at end of file
+        return has_capability(request, self.capability)
+
+    def has_object_permission(self, request, view, obj):
+        if self.object_capability and request.method not in permissions.SAFE_METHODS:
+            return has_capability(request, self.object_capability)
+        return True
+
+
+_permission_classes = {}
+
+
+def require(capability, object_capability=None):
+    """Return a (cached) HasCapability subclass for use in permission_classes."""
+    key = (capability, object_capability)
+    cls = _permission_classes.get(key)
+    if cls is None:
+        name = 'Require_' + capability.replace('.', '_')
+        cls = type(name, (HasCapability,), {
+            'capability': capability,
+            'object_capability': object_capability,
+        })
+        _permission_classes[key] = cls
+    return cls
+
+
+class IsBoardOrHigher(HasCapability):
+    capability = Capability.BOARD_ACCESS
+
+
+class CanManageUsers(HasCapability):
+    capability = Capability.USERS_MANAGE
@@ -0,0 +1,57 @@
+"""
+Revocation store for rotated refresh tokens.
+
+Only the jti and expiry of a revoked token are kept, with the jti as primary
+key. Membership checks hit the cache first and fall back to a primary key
+lookup. Rows are useless once their token has expired, so purge_revoked_tokens
+keeps the table no larger than one refresh lifetime of rotations.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+
+def _cache_key(jti):
+    return f'auth:revoked:{jti}'
+
+
+def _expiry(exp):
+    return datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+
+
+def revoke(jti, exp):
+    """Revoke a token; returns False if it had already been revoked."""
+    expires_at = _expiry(exp)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        revoked = True
+    except IntegrityError:
+        revoked = False
+    timeout = max(1, int((expires_at - timezone.now()).total_seconds()))
+    cache.set(_cache_key(jti), True, timeout)
+    return revoked
+
+
+def is_revoked(jti):
+    if cache.get(_cache_key(jti)):
+        return True
+    return RevokedToken.objects.filter(pk=jti).exists()
+
+
+def purge_expired(batch_size=5000):
+    """Delete revocations whose token has expired anyway, in batches."""
+    now = timezone.now()
+    deleted = 0
+    while True:
+        batch = list(
+            RevokedToken.objects.filter(expires_at__lt=now)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            return deleted
+        deleted += RevokedToken.objects.filter(pk__in=batch).delete()[0]
@@ -1,38 +1,77 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
-from django.core.files.base import ContentFile
-import base64
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 import uuid
+from .images import VARIANT_SIZES, validate_image_dimensions
+from .uploads import decode_base64_upload, max_upload_size, too_large_message
+from .authentication import ROLE_CLAIM, ACTIVE_CLAIM
+from .permissions import Capability, has_capability
+from .revocation import is_revoked, revoke
 
 User = get_user_model()
 
 class Base64ImageField(serializers.ImageField):
+    """Image field accepting multipart file uploads, or base64 data URIs as a fallback."""
+
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
+            # Get the format and the actual base64 content
+            format, _, imgstr = data.partition(';base64,')
+            ext = format.split('/')[-1]
+
+            # Generate a unique filename
+            filename = f"{uuid.uuid4()}.{ext}"
+
+            # Decode to a temporary file in chunks; oversized payloads are refused first
             try:
-                # Get the format and the actual base64 content
-                format, imgstr = data.split(';base64,')
-                ext = format.split('/')[-1]
-                
-                # Generate a unique filename
-                filename = f"{uuid.uuid4()}.{ext}"
-                
-                # Convert base64 to file content
-                data = ContentFile(base64.b64decode(imgstr), name=filename)
-            except Exception:
+                data = decode_base64_upload(imgstr, filename, f"image/{ext}")
+            except ValueError:
                 return None
-        return super().to_internal_value(data)
+        elif hasattr(data, 'size'):
+            if data.size > max_upload_size():
+                raise serializers.ValidationError(too_large_message())
+            # Store multipart uploads under a unique name, like the base64 ones
+            ext = data.name.rsplit('.', 1)[-1].lower() if '.' in data.name else 'jpg'
+            data.name = f"{uuid.uuid4()}.{ext}"
+        image = super().to_internal_value(data)
+        validate_image_dimensions(image)
+        return image
+
+class ProfilePictureVariantsField(serializers.Field):
+    """Absolute URLs of the resized profile picture copies, by size and format."""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, user):
+        variants = user.profile_picture_variants or {}
+        if not user.profile_picture or variants.get('source') != user.profile_picture.name:
+            return None
+        request = self.context.get('request')
+        storage = user.profile_picture.storage
+        urls = {}
+        for size_name in VARIANT_SIZES:
+            urls[size_name] = {}
+            for extension, name in variants.get(size_name, {}).items():
+                url = storage.url(name)
+                urls[size_name][extension] = request.build_absolute_uri(url) if request else url
+        return urls
 
 class UserSerializer(serializers.ModelSerializer):
     profile_picture = Base64ImageField(required=False, allow_null=True)
+    profile_picture_variants = ProfilePictureVariantsField()
 
     class Meta:
         model = User
         fields = (
             'id', 'username', 'email', 'first_name', 'last_name',
             'graduating_year', 'major', 'description',
-            'profile_picture', 'title', 'role', 'is_main'
+            'profile_picture', 'profile_picture_variants', 'title', 'role', 'is_main'
         )
         read_only_fields = ('id',)
 
@@ -48,11 +87,11 @@ class UserSerializer(serializers.ModelSerializer):
 
         # Only admin and president can change roles
         if 'role' in attrs:
-            if not (request.user.role == 'ADMIN' or request.user.role == 'PRESIDENT'):
+            if not has_capability(request, Capability.USERS_MANAGE):
                 attrs.pop('role')
             elif attrs['role'] not in ['BOARD', 'PRESIDENT']:
                 raise serializers.ValidationError({"role": "Invalid role selected."})
-            elif request.user.role == 'PRESIDENT' and attrs['role'] == 'PRESIDENT':
+            elif not has_capability(request, Capability.USERS_ASSIGN_ROLES) and attrs['role'] == 'PRESIDENT':
                 raise serializers.ValidationError({"role": "Only admins can assign the PRESIDENT role."})
 
         return attrs
@@ -85,7 +124,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            if request.user.role != 'ADMIN' and attrs.get('role') not in ['BOARD']:
+            if not has_capability(request, Capability.USERS_ASSIGN_ROLES) and attrs.get('role') not in ['BOARD']:
                 raise serializers.ValidationError({"role": "You can only create board members."})
         return attrs
 
@@ -109,4 +148,51 @@ class AdminUserSerializer(UserSerializer):
         # Handle profile picture update
         if 'profile_picture' in validated_data:
             instance.profile_picture = validated_data.pop('profile_picture')
-        return super().update(instance, validated_data) 
\ No newline at end of file
+        return super().update(instance, validated_data) 
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issue tokens that carry the role and active flag for ClaimsJWTAuthentication."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLE_CLAIM] = user.role
+        token[ACTIVE_CLAIM] = user.is_active
+        return token
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh with rotation, revoking each used refresh token in RevokedToken.
+
+    Revoking is an insert keyed by jti, so two concurrent refreshes with the
+    same token can't both succeed. Role claims are re-read from the user so
+    rotated tokens never carry a stale role.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        jti = refresh[api_settings.JTI_CLAIM]
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            if not revoke(jti, refresh['exp']):
+                raise InvalidToken('Token is blacklisted')
+        elif is_revoked(jti):
+            raise InvalidToken('Token is blacklisted')
+
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        if ROLE_CLAIM in refresh:
+            refresh[ROLE_CLAIM] = user.role
+            refresh[ACTIVE_CLAIM] = user.is_active
+
+        data = {'access': str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
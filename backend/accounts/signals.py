@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.caching import bump_generation
+from .authentication import forget_user, remember_user_state
+from .images import schedule_variants
+
+User = get_user_model()
+
+TEAM_CACHE_NAMESPACE = 'team'
+
+
+@receiver(post_save, sender=User)
+def invalidate_team_roster_on_save(sender, instance, update_fields=None, **kwargs):
+    # Logging in only touches last_login, which the roster doesn't show
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_generation(TEAM_CACHE_NAMESPACE)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_team_roster_on_delete(sender, instance, **kwargs):
+    bump_generation(TEAM_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=User)
+def process_profile_picture(sender, instance, update_fields=None, **kwargs):
+    if update_fields and 'profile_picture' not in update_fields:
+        return
+    if instance.profile_picture and instance.profile_picture.name != instance.profile_picture_variants.get('source'):
+        schedule_variants(instance)
+
+
+@receiver(post_save, sender=User)
+def refresh_cached_user_state(sender, instance, **kwargs):
+    # Overrides role/active claims in tokens issued before this change
+    remember_user_state(instance)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
@@ -0,0 +1,94 @@
+"""
+Streaming handling for profile picture uploads.
+
+Multipart uploads are written to a temporary file chunk by chunk and rejected
+as soon as they cross PROFILE_PICTURE_MAX_UPLOAD_SIZE, so a picture is never
+held in memory as a whole. The base64 JSON path is kept for older clients.
+"""
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# Room for the non-file fields and multipart boundaries of a profile form
+MULTIPART_OVERHEAD = 64 * 1024
+# Must be a multiple of 4 so every chunk is valid base64 on its own
+BASE64_CHUNK_SIZE = 256 * 1024
+
+
+def max_upload_size():
+    return getattr(settings, 'PROFILE_PICTURE_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+
+
+def too_large_message():
+    return f'Profile pictures must be smaller than {filesizeformat(max_upload_size())}.'
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_code = 'upload_too_large'
+
+    def __init__(self, detail=None, code=None):
+        if detail is None:
+            detail = too_large_message()
+        super().__init__(detail, code)
+
+
+class CappedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploaded files to disk, aborting once the size cap is exceeded."""
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Refuse obviously oversized bodies before reading any of them
+        if content_length and content_length > max_upload_size() + MULTIPART_OVERHEAD:
+            raise UploadTooLarge()
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_size():
+            self.upload_interrupted()
+            raise UploadTooLarge()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class DecodedUpload(TemporaryUploadedFile):
+    """Temporary file holding a decoded base64 upload.
+
+    Unlike multipart uploads it isn't closed by the request, so close it when
+    it is garbage collected; storage may already have moved the file away.
+    """
+
+    def __del__(self):
+        self.close()
+
+
+def decode_base64_upload(encoded, filename, content_type):
+    """Decode a base64 payload into a temporary file in fixed-size chunks.
+
+    The decoded size is checked against the cap before any decoding happens.
+    """
+    if len(encoded) * 3 // 4 > max_upload_size():
+        raise UploadTooLarge()
+
+    upload = DecodedUpload(filename, content_type, 0, None)
+    try:
+        size = 0
+        for offset in range(0, len(encoded), BASE64_CHUNK_SIZE):
+            chunk = base64.b64decode(encoded[offset:offset + BASE64_CHUNK_SIZE], validate=True)
+            upload.write(chunk)
+            size += len(chunk)
+    except (binascii.Error, ValueError):
+        upload.close()
+        raise
+    upload.size = size
+    upload.seek(0)
+    return upload
@@ -2,27 +2,43 @@ from django.shortcuts import render
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth import get_user_model
 from .serializers import RegisterSerializer, UserSerializer, AdminUserSerializer
-from .permissions import IsAdmin, IsPresident, IsBoardOrHigher
+from .permissions import Capability, CanManageUsers, has_capability
+from .signals import TEAM_CACHE_NAMESPACE
+from .uploads import CappedTemporaryFileUploadHandler
+from core.caching import CachedListMixin
 
 User = get_user_model()
 
 # Create your views here.
 
-class RegisterView(generics.CreateAPIView):
+class StreamingUploadMixin:
+    """Accept multipart profile picture uploads streamed to disk under a size cap.
+
+    JSON bodies with a base64 data URI keep working for older clients.
+    """
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Must be set before anything reads the request body
+        request.upload_handlers = [CappedTemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+class RegisterView(StreamingUploadMixin, generics.CreateAPIView):
     queryset = User.objects.all()
-    permission_classes = (IsAdmin|IsPresident,)  # Only admins and presidents can register users
+    permission_classes = (CanManageUsers,)  # Only admins and presidents can register users
     serializer_class = RegisterSerializer
 
     def perform_create(self, serializer):
         # If not admin, force role to be BOARD
-        if self.request.user.role != 'ADMIN':
+        if not has_capability(self.request, Capability.USERS_ASSIGN_ROLES):
             serializer.validated_data['role'] = 'BOARD'
         serializer.save()
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(StreamingUploadMixin, generics.RetrieveUpdateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = UserSerializer
 
@@ -30,7 +46,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 class UserManagementView(generics.ListCreateAPIView):
-    permission_classes = (IsAdmin|IsPresident,)
+    permission_classes = (CanManageUsers,)
     serializer_class = AdminUserSerializer
     
     def get_queryset(self):
@@ -38,12 +54,12 @@ class UserManagementView(generics.ListCreateAPIView):
         return User.objects.exclude(role='ADMIN')
 
     def get_serializer_class(self):
-        if self.request.user.role == 'ADMIN':
+        if has_capability(self.request, Capability.USERS_ASSIGN_ROLES):
             return AdminUserSerializer
         return UserSerializer
 
-class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
-    permission_classes = (IsAdmin|IsPresident,)
+class UserDetailView(StreamingUploadMixin, generics.RetrieveUpdateDestroyAPIView):
+    permission_classes = (CanManageUsers,)
     serializer_class = AdminUserSerializer
     
     def get_queryset(self):
@@ -51,25 +67,22 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
         return User.objects.exclude(role='ADMIN')
 
     def get_serializer_class(self):
-        if self.request.user.role == 'ADMIN':
+        if has_capability(self.request, Capability.USERS_ASSIGN_ROLES):
             return AdminUserSerializer
         return UserSerializer
 
     def perform_update(self, serializer):
         # Only admins can change roles
-        if self.request.user.role != 'ADMIN' and 'role' in self.request.data:
+        if not has_capability(self.request, Capability.USERS_ASSIGN_ROLES) and 'role' in self.request.data:
             raise permissions.PermissionDenied("Only admins can change user roles.")
         serializer.save()
 
-class TeamMembersView(generics.ListAPIView):
+class TeamMembersView(CachedListMixin, generics.ListAPIView):
     permission_classes = (permissions.AllowAny,)  # Public endpoint
     serializer_class = UserSerializer
-    
+    pagination_class = None  # The whole roster is rendered at once
+    cache_namespace = TEAM_CACHE_NAMESPACE  # Invalidated by User/TeamMember saves
+
     def get_queryset(self):
         # Exclude admin users and order by role and main status
         return User.objects.exclude(role='ADMIN').order_by('-role', '-is_main')
-    
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
@@ -0,0 +1,113 @@
+import base64
+import glob
+import json
+import os
+import random
+
+from django.conf import settings
+
+BENCH_SENDER = 'bench.sender@yale.edu'
+
+
+def _b64(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _headers(subject, sender):
+    return [
+        {'name': 'Subject', 'value': subject},
+        {'name': 'From', 'value': f'Bench Sender <{sender}>'},
+        {'name': 'To', 'value': 'asiancrossroads@gmail.com'},
+    ]
+
+
+def _text_part(text):
+    return {'mimeType': 'text/plain', 'filename': '', 'body': {'size': len(text), 'data': _b64(text)}}
+
+
+def _html_part(html):
+    return {'mimeType': 'text/html', 'filename': '', 'body': {'size': len(html), 'data': _b64(html)}}
+
+
+def _saved_html():
+    """The large newsletter bodies kept in saved_emails/, or a synthetic one."""
+    pattern = os.path.join(settings.BASE_DIR, 'saved_emails', '*.html')
+    bodies = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding='utf-8') as f:
+            bodies.append(f.read())
+    if not bodies:
+        paragraph = '<p style="font-family: Arial;">Lorem ipsum dolor sit amet.</p>'
+        bodies.append(f'<html><body>{paragraph * 400}</body></html>')
+    return bodies
+
+
+def build_corpus(count, sender=BENCH_SENDER, attachment_kb=(64, 512), seed=0):
+    """Build `count` Gmail `messages.get` payloads of realistic shapes.
+
+    The mix cycles through plain text, multipart/alternative with the large
+    saved_emails HTML, and multipart/mixed with binary attachments. Returns
+    (messages, attachments) where attachments maps (message_id, attachment_id)
+    to raw bytes, as FakeGmailService expects.
+    """
+    rng = random.Random(seed)
+    html_bodies = _saved_html()
+    messages = []
+    attachments = {}
+
+    for i in range(count):
+        msg_id = f'bench{i:06d}'
+        subject = f'Benchmark message {i}'
+        kind = i % 3
+        html = html_bodies[i % len(html_bodies)]
+        text = f'Plain text announcement number {i}.\n\n' + 'Details follow. ' * 200
+
+        if kind == 0:
+            payload = _text_part(text)
+            payload['headers'] = _headers(subject, sender)
+        elif kind == 1:
+            payload = {
+                'mimeType': 'multipart/alternative',
+                'filename': '',
+                'headers': _headers(subject, sender),
+                'body': {'size': 0},
+                'parts': [_text_part(text), _html_part(html)],
+            }
+        else:
+            parts = [{
+                'mimeType': 'multipart/alternative',
+                'filename': '',
+                'body': {'size': 0},
+                'parts': [_text_part(text), _html_part(html)],
+            }]
+            for n, size_kb in enumerate(attachment_kb):
+                attachment_id = f'att{n}'
+                data = rng.randbytes(size_kb * 1024)
+                attachments[(msg_id, attachment_id)] = data
+                parts.append({
+                    'mimeType': 'application/pdf',
+                    'filename': f'flyer-{n}.pdf',
+                    'body': {'size': len(data), 'attachmentId': attachment_id},
+                })
+            payload = {
+                'mimeType': 'multipart/mixed',
+                'filename': '',
+                'headers': _headers(subject, sender),
+                'body': {'size': 0},
+                'parts': parts,
+            }
+
+        messages.append({'id': msg_id, 'labelIds': ['UNREAD'], 'payload': payload})
+
+    return messages, attachments
+
+
+def load_recorded(directory):
+    """Load recorded `messages.get` responses saved as one JSON file per message."""
+    messages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        with open(path, encoding='utf-8') as f:
+            messages.append(json.load(f))
+    return messages
@@ -0,0 +1,139 @@
+import base64
+import copy
+import itertools
+import json
+import re
+
+import httpx
+
+FROM_QUERY_RE = re.compile(r'from:\(([^)]*)\)')
+
+
+def _sender(msg):
+    sender = next(h['value'] for h in msg['payload']['headers'] if h['name'] == 'From')
+    return sender.split('<')[-1].strip('>').lower()
+
+
+class _Call:
+    """Mimics the request object returned by googleapiclient; call execute()."""
+
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self, num_retries=0, **kwargs):
+        return self._fn()
+
+
+class FakeGmailService:
+    """In-memory stand-in for the Gmail API client used by gmail_service.
+
+    It replays recorded `messages.get` payloads, serves their attachment bodies and
+    records everything that is modified or sent, so the ingestion and send
+    pipelines can be exercised without network access. transport() serves the
+    same data over Gmail's REST paths for gmail_async.AsyncGmailClient.
+    """
+
+    def __init__(self, messages=(), attachments=None):
+        self._messages = {msg['id']: msg for msg in messages}
+        self._unread = [msg['id'] for msg in messages]
+        self._attachments = dict(attachments or {})
+        self._send_ids = itertools.count(1)
+        self.sent = []
+        self.modified = []
+        self.calls = 0
+
+    # The googleapiclient resource chain: service.users().messages()...
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def attachments(self):
+        return _FakeAttachments(self)
+
+    def list(self, userId='me', labelIds=None, q=None, **kwargs):
+        # Honour a from:(a OR b) clause like Gmail's search would
+        match = FROM_QUERY_RE.search(q or '')
+        senders = {s.strip().lower() for s in match.group(1).split(' OR ')} if match else None
+
+        def run():
+            self.calls += 1
+            return {'messages': [
+                {'id': msg_id} for msg_id in self._unread
+                if senders is None or _sender(self._messages[msg_id]) in senders
+            ]}
+        return _Call(run)
+
+    def get(self, userId='me', id=None, format='full', metadataHeaders=None, **kwargs):
+        def run():
+            self.calls += 1
+            msg = self._messages[id]
+            if format == 'metadata':
+                wanted = set(metadataHeaders or ())
+                headers = [h for h in msg['payload']['headers'] if not wanted or h['name'] in wanted]
+                return {'id': msg['id'], 'payload': {'headers': copy.deepcopy(headers)}}
+            # Hand out a copy so callers can't mutate the recorded payload
+            return copy.deepcopy(msg)
+        return _Call(run)
+
+    def modify(self, userId='me', id=None, body=None):
+        def run():
+            self.calls += 1
+            self.modified.append(id)
+            if 'UNREAD' in (body or {}).get('removeLabelIds', []) and id in self._unread:
+                self._unread.remove(id)
+            return {'id': id}
+        return _Call(run)
+
+    def batchModify(self, userId='me', body=None):
+        def run():
+            self.calls += 1
+            self.modified.extend(body['ids'])
+            if 'UNREAD' in body.get('removeLabelIds', []):
+                marked = set(body['ids'])
+                self._unread = [msg_id for msg_id in self._unread if msg_id not in marked]
+            return {}
+        return _Call(run)
+
+    def send(self, userId='me', body=None):
+        def run():
+            self.calls += 1
+            self.sent.append(len(body['raw']))
+            return {'id': f'sent-{next(self._send_ids)}'}
+        return _Call(run)
+
+
+    def transport(self):
+        """An httpx transport answering the REST calls AsyncGmailClient makes."""
+        def handle(request):
+            parts = request.url.path.split('/messages', 1)[1].strip('/').split('/')
+            params = request.url.params
+            if request.method == 'POST':
+                body = json.loads(request.content)
+                call = self.batchModify(body=body) if parts == ['batchModify'] else self.send(body=body)
+            elif parts == ['']:
+                call = self.list(labelIds=params.get_list('labelIds'), q=params.get('q'))
+            elif len(parts) == 3 and parts[1] == 'attachments':
+                call = self.attachments().get(messageId=parts[0], id=parts[2])
+            else:
+                call = self.get(
+                    id=parts[0], format=params.get('format', 'full'),
+                    metadataHeaders=params.get_list('metadataHeaders'),
+                )
+            return httpx.Response(200, json=call.execute())
+        return httpx.MockTransport(handle)
+
+
+class _FakeAttachments:
+    def __init__(self, service):
+        self._service = service
+
+    def get(self, userId='me', messageId=None, id=None):
+        def run():
+            self._service.calls += 1
+            data = self._service._attachments.get((messageId, id))
+            if data is None:
+                return {}
+            return {'size': len(data), 'data': base64.urlsafe_b64encode(data).decode('ascii')}
+        return _Call(run)
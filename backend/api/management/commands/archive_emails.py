@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from api.services.email_archive import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE, archive_emails
+
+class Command(BaseCommand):
+    help = (
+        'Move emails sent or rejected more than --days ago from IncomingEmail to '
+        'ArchivedEmail (run periodically, e.g. nightly from cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS, help='Archive emails older than this')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Emails moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the emails that would be archived')
+
+    def handle(self, *args, **options):
+        count = archive_emails(
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f'{count} emails would be archived')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Archived {count} emails'))
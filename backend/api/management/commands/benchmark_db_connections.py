@@ -0,0 +1,157 @@
+import json
+import queue
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from core import db_metrics
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """Serves requests on a fixed set of threads, like gunicorn's gthread workers,
+    so a thread's persistent DB connection is reused across requests."""
+    request_queue_size = 128  # wsgiref's 5 makes bursts wait on TCP retransmits
+
+    def __init__(self, *args, threads=8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = queue.Queue()
+        for _ in range(threads):
+            threading.Thread(target=self.work, daemon=True).start()
+
+    def process_request(self, request, client_address):
+        self.requests.put((request, client_address))
+
+    def work(self):
+        while True:
+            request, client_address = self.requests.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def connection_profile():
+    settings_dict = connections['default'].settings_dict
+    return {
+        'vendor': connections['default'].vendor,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'conn_health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+        'pool': settings_dict.get('OPTIONS', {}).get('pool') or None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve the app over HTTP on worker threads and measure request latency and DB '
+        'connection churn at several concurrency levels. Run it once per settings '
+        'profile (e.g. DB_CONN_MAX_AGE=0, core.settings_production, DB_POOL=1) to compare. Writes JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/events/', help='Endpoint to request')
+        parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated client concurrency levels')
+        parser.add_argument('--requests', type=int, default=400, help='Requests per concurrency level')
+        parser.add_argument('--threads', type=int, default=8, help='Server worker threads')
+        parser.add_argument('--conn-max-age', type=int, help='Override CONN_MAX_AGE for this run')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['conn_max_age'] is not None:
+            connections.settings['default']['CONN_MAX_AGE'] = options['conn_max_age']
+        db_metrics.install()
+
+        server = make_server(
+            '127.0.0.1', 0, WSGIHandler(),
+            server_class=lambda *a, **kw: PooledWSGIServer(*a, threads=options['threads'], **kw),
+            handler_class=QuietHandler,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}{options["path"]}'
+
+        def fetch(_):
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as e:
+                # urlopen raises for 4xx/5xx; those count as errors, not a failed run
+                with e:
+                    e.read()
+                status = e.code
+            return time.perf_counter() - start, status
+
+        # Warm up: URL resolution, imports, first connections
+        for _ in range(options['threads']):
+            fetch(None)
+
+        levels = []
+        try:
+            for concurrency in [int(level) for level in options['concurrency'].split(',')]:
+                opened_before = self.connections_opened()
+                start = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    results = list(pool.map(fetch, range(options['requests'])))
+                elapsed = time.perf_counter() - start
+                latencies = [latency * 1000 for latency, _ in results]
+                opened = self.connections_opened() - opened_before
+                levels.append({
+                    'concurrency': concurrency,
+                    'requests': len(results),
+                    'errors': sum(1 for _, status in results if status >= 400),
+                    'throughput_rps': round(len(results) / elapsed, 1),
+                    'latency_ms': {
+                        'p50': round(statistics.median(latencies), 3),
+                        'p95': round(_percentile(latencies, 95), 3),
+                        'p99': round(_percentile(latencies, 99), 3),
+                        'mean': round(statistics.fmean(latencies), 3),
+                    },
+                    'connections_opened': opened,
+                    'connections_per_request': round(opened / len(results), 3),
+                })
+        finally:
+            server.shutdown()
+
+        results = {
+            'benchmark': 'db_connections',
+            'timestamp': timezone.now().isoformat(),
+            'path': options['path'],
+            'server_threads': options['threads'],
+            **connection_profile(),
+            'levels': levels,
+        }
+        pool = db_metrics.pool_of('default')
+        if pool is not None:
+            results['pool_stats'] = pool.get_stats()
+
+        rendered = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(rendered + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote connection results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
+
+    def connections_opened(self):
+        return sum(db_metrics.connections_opened.samples().values())
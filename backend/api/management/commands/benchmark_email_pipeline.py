@@ -0,0 +1,257 @@
+import contextlib
+import io
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+import httpx
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.benchmarks.corpus import BENCH_SENDER, build_corpus, load_recorded
+from api.benchmarks.fake_gmail import FakeGmailService
+from api.models import IncomingEmail, MailingListSubscriber
+from api.services import gmail_async, gmail_service
+
+User = get_user_model()
+
+
+def _summarize(samples):
+    """Aggregate per-message stage timings (seconds) into a JSON friendly dict."""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(samples),
+        'total_s': round(sum(samples), 6),
+        'mean_ms': round(statistics.mean(samples) * 1000, 4),
+        'p50_ms': round(ordered[len(ordered) // 2] * 1000, 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        'max_ms': round(ordered[-1] * 1000, 4),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark email ingestion and sending against a fake Gmail service and write JSON results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=60, help='Number of synthetic messages to ingest')
+        parser.add_argument(
+            '--unauthorized', type=int, default=0,
+            help='Extra messages from an outside sender mixed into the inbox'
+        )
+        parser.add_argument('--subscribers', type=int, default=50, help='Active subscribers to send each email to')
+        parser.add_argument('--send-emails', type=int, default=3, help='How many ingested emails to send out')
+        parser.add_argument(
+            '--sends-per-second', type=float, default=0,
+            help='Pace sends like production (GMAIL_SENDS_PER_SECOND); 0 measures the pipeline unpaced'
+        )
+        parser.add_argument(
+            '--backlog-workers', type=int, default=0,
+            help='Also time ingest_backlog with this many worker processes'
+        )
+        parser.add_argument('--payloads-dir', help='Directory of recorded messages.get JSON payloads to replay instead')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--verbose', action='store_true', help='Keep the pipeline console output')
+
+    def handle(self, *args, **options):
+        if options['payloads_dir']:
+            messages, attachments = load_recorded(options['payloads_dir']), {}
+        else:
+            messages, attachments = build_corpus(options['messages'])
+        if options['unauthorized']:
+            outside, outside_attachments = build_corpus(
+                options['unauthorized'], sender='outsider@example.com', seed=1
+            )
+            for msg in outside:
+                msg['id'] = 'outside' + msg['id']
+            messages = messages + outside
+            attachments.update({('outside' + msg_id, att_id): data for (msg_id, att_id), data in outside_attachments.items()})
+
+        corpus_bytes = len(json.dumps(messages))
+        quiet = not options['verbose']
+
+        stages = self.measure_stages(messages, attachments)
+        timed = self.run_pipelines(messages, attachments, options, quiet, trace_memory=False)
+        traced = self.run_pipelines(messages, attachments, options, quiet, trace_memory=True)
+
+        results = {
+            'benchmark': 'email_pipeline',
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'corpus': {
+                'messages': len(messages),
+                'attachments': len(attachments),
+                'unauthorized': options['unauthorized'],
+                'payload_bytes': corpus_bytes,
+                'source': options['payloads_dir'] or 'synthetic',
+            },
+            'ingest': {
+                **timed['ingest'],
+                'peak_memory_bytes': traced['ingest']['peak_memory_bytes'],
+            },
+            'send': {
+                **timed['send'],
+                'peak_memory_bytes': traced['send']['peak_memory_bytes'],
+            },
+            'stages': stages,
+        }
+        if options['backlog_workers']:
+            results['backlog_ingest'] = self.run_backlog(messages, attachments, options['backlog_workers'])
+
+        rendered = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(rendered + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote benchmark results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
+
+    def measure_stages(self, messages, attachments):
+        """Time each pipeline stage in isolation, message by message."""
+        timings = {'parse': [], 'sanitize': [], 'mime_build': [], 'encode': []}
+        logo_data = gmail_service.read_logo_bytes()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            for msg in messages:
+                start = time.perf_counter()
+                subject, sender_email = gmail_service.parse_sender(msg['payload']['headers'])
+                content, raw_html, meta = gmail_service.process_parts(
+                    msg['payload'], msg['id'], sanitize=False
+                )
+                timings['parse'].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                html_content = gmail_service.sanitize_html(raw_html) if raw_html else None
+                if not content and html_content:
+                    content = gmail_service.html_to_text(html_content)
+                final_html = gmail_service.add_logo_to_html(html_content or content, mode="datauri")
+                timings['sanitize'].append(time.perf_counter() - start)
+
+                email = IncomingEmail(
+                    sender_email=sender_email,
+                    subject=subject,
+                    content=content,
+                    html_content=final_html,
+                    original_email_id=msg['id'],
+                    has_attachments=bool(meta),
+                    attachments=meta,
+                )
+                files = []
+                for attachment_meta in meta:
+                    attachment_id = attachment_meta['attachment_id'][len(msg['id']) + 1:]
+                    data = attachments.get((msg['id'], attachment_id))
+                    if data is not None:
+                        files.append((attachment_meta, data))
+
+                start = time.perf_counter()
+                message = gmail_service.build_subscriber_message(
+                    email, 'subscriber@example.com', logo_data, files
+                )
+                timings['mime_build'].append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                gmail_service.encode_message(message)
+                timings['encode'].append(time.perf_counter() - start)
+
+        return {name: _summarize(samples) for name, samples in timings.items()}
+
+    def run_pipelines(self, messages, attachments, options, quiet, trace_memory):
+        """Run check_new_emails and send_approved_email end to end, then roll back.
+
+        Sending goes through gmail_async like the approve view, with the fake
+        service behind an httpx transport.
+        """
+        output = contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+        results = {}
+
+        with output, transaction.atomic():
+            sender = User.objects.filter(email__iexact=BENCH_SENDER).first()
+            if sender is None:
+                User.objects.create_user(
+                    username='bench-sender',
+                    email=BENCH_SENDER,
+                    password=None,
+                    role='BOARD',
+                )
+            MailingListSubscriber.objects.bulk_create([
+                MailingListSubscriber(
+                    email=f'bench-subscriber-{n}@example.com',
+                    first_name='Bench',
+                    last_name=str(n),
+                )
+                for n in range(options['subscribers'])
+            ])
+
+            service = FakeGmailService(messages, attachments)
+            results['ingest'] = self._measure(
+                lambda: gmail_service.check_new_emails(service=service),
+                trace_memory,
+            )
+            results['ingest']['gmail_calls'] = service.calls
+
+            email_ids = list(
+                IncomingEmail.objects.filter(original_email_id__in=[m['id'] for m in messages])
+                .order_by('-id')
+                .values_list('id', flat=True)[:options['send_emails']]
+            )
+            service = FakeGmailService(messages, attachments)
+
+            @async_to_sync
+            async def send_all():
+                sent = 0
+                async with httpx.AsyncClient(transport=service.transport()) as http:
+                    client = gmail_async.AsyncGmailClient('bench', http)
+                    async for email in IncomingEmail.objects.filter(id__in=email_ids).order_by('-id'):
+                        sent += await gmail_async.send_approved_email(
+                            email, client, sends_per_second=options['sends_per_second']
+                        )
+                return sent
+
+            results['send'] = self._measure(send_all, trace_memory)
+            results['send']['gmail_calls'] = service.calls
+            results['send']['raw_bytes'] = sum(service.sent)
+
+            # Never keep benchmark rows around
+            transaction.set_rollback(True)
+
+        return results
+
+    def run_backlog(self, messages, attachments, workers):
+        """Time ingest_backlog, then roll back. Memory isn't traced: the work happens in child processes."""
+        with transaction.atomic():
+            if not User.objects.filter(email__iexact=BENCH_SENDER).exists():
+                User.objects.create_user(username='bench-sender', email=BENCH_SENDER, password=None, role='BOARD')
+            service = FakeGmailService(messages, attachments)
+            result = self._measure(
+                lambda: gmail_service.ingest_backlog(service=service, workers=workers),
+                trace_memory=False,
+            )
+            result['workers'] = workers
+            result['gmail_calls'] = service.calls
+            transaction.set_rollback(True)
+        return result
+
+    def _measure(self, fn, trace_memory):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        count = fn()
+        elapsed = time.perf_counter() - start
+        result = {
+            'messages': count,
+            'seconds': round(elapsed, 6),
+            'messages_per_sec': round(count / elapsed, 2) if elapsed else None,
+        }
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result['peak_memory_bytes'] = peak
+        return result
@@ -0,0 +1,114 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.benchmarks.corpus import BENCH_SENDER, build_corpus
+from api.models import IncomingEmail
+from api.services.gmail_service import build_email_record
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure IncomingEmail body storage: stored vs uncompressed bytes, table size '
+        'and read latency with and without decompressing. Writes JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--synthetic', type=int, default=0,
+            help='Measure this many synthetic emails (inserted and rolled back) instead of the real table'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per latency measurement')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['synthetic']:
+                messages, _ = build_corpus(options['synthetic'])
+                start = time.perf_counter()
+                IncomingEmail.objects.bulk_create([
+                    IncomingEmail(**build_email_record(msg, BENCH_SENDER, f'Synthetic {msg["id"]}'))
+                    for msg in messages
+                ])
+                insert_seconds = time.perf_counter() - start
+            else:
+                insert_seconds = None
+
+            results = {
+                'benchmark': 'email_storage',
+                'timestamp': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'source': 'synthetic' if options['synthetic'] else 'table',
+                **self.measure_sizes(),
+                'latency_ms': self.measure_latency(options['repeat']),
+            }
+            if insert_seconds is not None:
+                results['synthetic_insert_seconds'] = round(insert_seconds, 6)
+
+            # Never keep synthetic rows around
+            transaction.set_rollback(True)
+
+        rendered = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(rendered + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote storage results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
+
+    def measure_sizes(self):
+        table = IncomingEmail._meta.db_table
+        length = 'octet_length' if connection.vendor == 'postgresql' else 'length'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*), COALESCE(SUM({length}(content)), 0), '
+                f'COALESCE(SUM({length}(html_content)), 0) FROM {table}'
+            )
+            rows, content_bytes, html_bytes = cursor.fetchone()
+            table_bytes = None
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+                table_bytes = cursor.fetchone()[0]
+
+        raw_bytes = 0
+        for content, html_content in IncomingEmail.objects.values_list('content', 'html_content').iterator():
+            raw_bytes += len(str(content).encode('utf-8'))
+            if html_content is not None:
+                raw_bytes += len(str(html_content).encode('utf-8'))
+
+        stored_bytes = content_bytes + html_bytes
+        return {
+            'rows': rows,
+            'stored_body_bytes': stored_bytes,
+            'uncompressed_body_bytes': raw_bytes,
+            'compression_ratio': round(raw_bytes / stored_bytes, 2) if stored_bytes else None,
+            'table_bytes': table_bytes,
+        }
+
+    def measure_latency(self, repeat):
+        def list_only():
+            for email in IncomingEmail.objects.all():
+                email.subject
+
+        def read_bodies():
+            for email in IncomingEmail.objects.all():
+                email.content
+                email.html_content
+
+        return {
+            'load_rows': _median_ms(list_only, repeat),
+            'load_and_decompress_bodies': _median_ms(read_bodies, repeat),
+        }
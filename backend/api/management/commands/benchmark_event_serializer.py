@@ -0,0 +1,102 @@
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import Event
+from api.serializers import EventSerializer
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def synthetic_events(count, seed=0):
+    """Events spread a year either side of now, some without end date or capacity."""
+    rng = random.Random(seed)
+    now = timezone.now()
+    events = []
+    for i in range(count):
+        start = now + timedelta(hours=rng.randint(-24 * 365, 24 * 365))
+        capacity = rng.choice([None, 20, 50, 100, 200])
+        events.append(Event(
+            title=f'Synthetic event {i}',
+            description='Benchmark event ' * 20,
+            start_date=start,
+            end_date=start + timedelta(hours=rng.randint(1, 6)) if rng.random() < 0.7 else None,
+            venue='Hall',
+            category=rng.choice(Event.EVENT_CATEGORIES)[0],
+            capacity=capacity,
+            current_registrations=rng.randint(0, capacity or 150),
+            is_active=True,
+        ))
+    return events
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare EventSerializer with has_ended/is_full/spots_left computed per row in '
+        'Python against the SQL annotations, plus filtering and ordering on them. Writes JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=10000, help='Synthetic events (inserted and rolled back)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        with transaction.atomic():
+            Event.objects.bulk_create(synthetic_events(options['events']), batch_size=1000)
+            # .all() in each run so no run reuses another's result cache
+            plain = Event.objects.select_related('created_by')
+            annotated = Event.objects.with_status().select_related('created_by')
+
+            def filter_python():
+                return [e.pk for e in plain.all() if not e.has_ended and not e.is_full]
+
+            def filter_sql():
+                return list(annotated.filter(has_ended=False, is_full=False).values_list('pk', flat=True))
+
+            def order_python():
+                events = list(plain.all())
+                return sorted(events, key=lambda e: (e.spots_left is None, -(e.spots_left or 0)))[:50]
+
+            def order_sql():
+                return list(annotated.order_by('-spots_left')[:50])
+
+            results = {
+                'benchmark': 'event_serializer',
+                'timestamp': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'events': Event.objects.count(),
+                'latency_ms': {
+                    'serialize_properties': _median_ms(lambda: EventSerializer(plain.all(), many=True).data, repeat),
+                    'serialize_annotated': _median_ms(lambda: EventSerializer(annotated.all(), many=True).data, repeat),
+                    'filter_upcoming_open_python': _median_ms(filter_python, repeat),
+                    'filter_upcoming_open_sql': _median_ms(filter_sql, repeat),
+                    'top_50_by_spots_left_python': _median_ms(order_python, repeat),
+                    'top_50_by_spots_left_sql': _median_ms(order_sql, repeat),
+                },
+            }
+
+            # Never keep synthetic rows around
+            transaction.set_rollback(True)
+
+        rendered = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(rendered + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote event serializer results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
@@ -0,0 +1,110 @@
+import io
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.benchmarks.corpus import BENCH_SENDER, build_corpus
+from api.models import Event, IncomingEmail, MailingListSubscriber
+from api.serializers import EventSerializer, IncomingEmailSerializer, MailingListSubscriberSerializer
+from api.services.gmail_service import build_email_record
+from core.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+
+def _median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def build_payloads(events, subscribers, emails):
+    """Serialized data of our largest list responses, built from unsaved instances."""
+    now = timezone.now()
+    event_rows = [
+        Event(
+            pk=i, title=f'Event {i} – 亚洲十字路口', description='Talk and dinner. ' * 40,
+            start_date=now + timedelta(days=i), venue='Hall', capacity=100,
+            current_registrations=i % 120, is_active=True, created_at=now, updated_at=now,
+        )
+        for i in range(events)
+    ]
+    subscriber_rows = [
+        MailingListSubscriber(
+            pk=i, email=f'student{i}@yale.edu', first_name='Student', last_name=str(i),
+            university='Yale', interests='Culture, Events', subscribed_at=now,
+        )
+        for i in range(subscribers)
+    ]
+    messages, _ = build_corpus(emails, attachment_kb=(1,))
+    email_rows = []
+    for i, msg in enumerate(messages):
+        email = IncomingEmail(pk=i, **build_email_record(msg, BENCH_SENDER, f'Announcement {i}'))
+        email.updated_at = now
+        email_rows.append(email)
+    return {
+        'events': {'count': events, 'results': EventSerializer(event_rows, many=True).data},
+        'subscribers': {'count': subscribers, 'results': MailingListSubscriberSerializer(subscriber_rows, many=True).data},
+        'emails': {'count': emails, 'results': IncomingEmailSerializer(email_rows, many=True).data},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's stdlib JSONRenderer/JSONParser with core.renderers' orjson versions "
+        'on event, subscriber and email list payloads. Writes JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=1000, help='Events in the event payload')
+        parser.add_argument('--subscribers', type=int, default=5000, help='Subscribers in the subscriber payload')
+        parser.add_argument('--emails', type=int, default=100, help='Emails (with HTML bodies) in the email payload')
+        parser.add_argument('--repeat', type=int, default=10, help='Runs per measurement')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        payloads = build_payloads(options['events'], options['subscribers'], options['emails'])
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        parsers = {'stdlib': JSONParser(), 'fast': FastJSONParser()}
+
+        results = {
+            'benchmark': 'json',
+            'timestamp': timezone.now().isoformat(),
+            'orjson': orjson.__version__ if orjson else None,
+            'payloads': {},
+        }
+        for name, data in payloads.items():
+            rendered = stdlib.render(data)
+            identical = fast.render(data) == rendered
+            parse_ms = {
+                label: _median_ms(lambda: parser.parse(io.BytesIO(rendered)), repeat)
+                for label, parser in parsers.items()
+            }
+            render_ms = {
+                'stdlib': _median_ms(lambda: stdlib.render(data), repeat),
+                'fast': _median_ms(lambda: fast.render(data), repeat),
+            }
+            results['payloads'][name] = {
+                'bytes': len(rendered),
+                'identical_output': identical,
+                'render_ms': render_ms,
+                'parse_ms': parse_ms,
+                'render_speedup': round(render_ms['stdlib'] / render_ms['fast'], 2) if render_ms['fast'] else None,
+                'parse_speedup': round(parse_ms['stdlib'] / parse_ms['fast'], 2) if parse_ms['fast'] else None,
+            }
+
+        rendered = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(rendered + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote JSON results to {options['output']}"))
+        else:
+            self.stdout.write(rendered)
@@ -1,15 +1,30 @@
 from django.core.management.base import BaseCommand
-from api.services.gmail_service import check_new_emails
+from api.services.gmail_service import check_new_emails, ingest_backlog
+from api.services.mail_sync import coordinate
 
 class Command(BaseCommand):
     help = 'Check for new emails from board members and store them for approval'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backlog', action='store_true',
+            help='Catch up on a large backlog, parsing messages across a process pool'
+        )
+        parser.add_argument('--workers', type=int, help='Worker processes for --backlog (default: CPU count)')
+
     def handle(self, *args, **options):
+        if options['backlog']:
+            sync = lambda: ingest_backlog(workers=options['workers'])
+        else:
+            sync = check_new_emails
         try:
             self.stdout.write('Checking for new emails...')
-            check_new_emails()
-            self.stdout.write(self.style.SUCCESS('Successfully checked for new emails'))
+            result = coordinate(sync)
+            joined = ' (joined a sync already in progress)' if result.shared else ''
+            self.stdout.write(self.style.SUCCESS(
+                f'Successfully checked for new emails: {result.stored} stored in {result.duration_ms:.0f}ms{joined}'
+            ))
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error checking emails: {str(e)}')
-            ) 
\ No newline at end of file
+            )
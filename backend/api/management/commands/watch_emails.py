@@ -0,0 +1,137 @@
+import logging
+import signal
+import threading
+import time
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from googleapiclient.errors import HttpError
+
+from api.services import mail_sync
+from api.services.gmail_service import check_new_emails, get_gmail_service, gmail_execute
+from core import db_metrics
+from core.metrics import gauge, render_prometheus
+
+logger = logging.getLogger('api.watch_emails')
+
+heartbeat_gauge = gauge('mail_watcher_heartbeat_timestamp_seconds', 'Unix time of the last watcher poll')
+lag_gauge = gauge('mail_watcher_lag_seconds', 'Seconds since the last successful mailbox sync')
+interval_gauge = gauge('mail_watcher_poll_interval_seconds', 'Current delay between watcher polls')
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(addr, port):
+    """Expose this process' metrics over HTTP, since /metrics/ only covers the web workers."""
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')])
+        return [render_prometheus().encode('utf-8')]
+
+    db_metrics.install()
+    server = make_server(addr, port, app, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Command(BaseCommand):
+    help = (
+        'Watch the mailbox and store new emails for approval. Keeps one Gmail client, '
+        'polls faster after activity and backs off while idle. Stops cleanly on SIGTERM/SIGINT.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-interval', type=float, default=15, help='Seconds between polls after activity')
+        parser.add_argument('--max-interval', type=float, default=300, help='Longest delay between idle polls')
+        parser.add_argument('--backoff', type=float, default=2.0, help='Interval multiplier for each idle poll')
+        parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port')
+        parser.add_argument('--metrics-addr', default='127.0.0.1', help='Address for --metrics-port')
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self.request_stop)
+
+        if options['metrics_port']:
+            serve_metrics(options['metrics_addr'], options['metrics_port'])
+
+        min_interval, max_interval = options['min_interval'], options['max_interval']
+        interval = min_interval
+        self.service = None
+        self.history_id = None
+        self.last_sync = None
+        self.stdout.write(f'Watching mailbox (every {min_interval:g}-{max_interval:g}s)')
+
+        while not self.stop.is_set():
+            # Long-lived process: drop DB connections the server may have closed
+            close_old_connections()
+            try:
+                active = self.poll()
+                interval = min_interval if active else min(interval * options['backoff'], max_interval)
+            except Exception:
+                logger.exception('Mailbox poll failed, rebuilding the Gmail client')
+                self.service = None
+                interval = min(interval * options['backoff'], max_interval)
+
+            self.heartbeat(interval)
+            self.stop.wait(interval)
+
+        close_old_connections()
+        self.stdout.write('Mailbox watcher stopped')
+
+    def request_stop(self, signum, frame):
+        logger.info('Received signal %s, stopping after the current poll', signum)
+        self.stop.set()
+
+    def poll(self):
+        """Sync if the mailbox changed since the last poll. Returns True if it did."""
+        if self.service is None:
+            self.service = get_gmail_service()
+
+        if not self.mailbox_changed():
+            return False
+
+        # Take the history id before syncing: anything arriving during the sync
+        # shows up as a change on the next poll.
+        profile = gmail_execute(self.service.users().getProfile(userId='me'), 'getProfile')
+        result = mail_sync.coordinate(lambda: check_new_emails(self.service))
+        self.history_id = profile['historyId']
+        self.last_sync = time.time()
+        logger.info(
+            'Mailbox sync stored %d emails in %.0fms', result.stored, result.duration_ms,
+            extra={'stored': result.stored, 'shared': result.shared, 'duration_ms': result.duration_ms},
+        )
+        return True
+
+    def mailbox_changed(self):
+        """Ask Gmail's history API whether messages were added since the last sync."""
+        if self.history_id is None:
+            return True
+        try:
+            history = gmail_execute(self.service.users().history().list(
+                userId='me',
+                startHistoryId=self.history_id,
+                historyTypes=['messageAdded'],
+                maxResults=1
+            ), 'history.list')
+        except HttpError as e:
+            if e.resp.status == 404:
+                # History id too old, fall back to a full sync
+                self.history_id = None
+                return True
+            raise
+        return bool(history.get('history'))
+
+    def heartbeat(self, interval):
+        now = time.time()
+        heartbeat_gauge.set(now)
+        interval_gauge.set(interval)
+        if self.last_sync is not None:
+            lag_gauge.set(now - self.last_sync)
+        try:
+            mail_sync.heartbeat(interval)
+        except Exception:
+            logger.exception('Could not record watcher heartbeat')
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_mailboxsync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mailboxsync',
+            name='watcher_heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mailboxsync',
+            name='watcher_interval',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_mailboxsync_watcher'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incomingemail',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:30
+
+import core.fields
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+
+def copy_bodies(apps, source, target):
+    IncomingEmail = apps.get_model('api', 'IncomingEmail')
+    pending = []
+    for email in IncomingEmail.objects.only('id', *source).iterator(chunk_size=BATCH_SIZE):
+        for src, dst in zip(source, target):
+            value = getattr(email, src)
+            setattr(email, dst, None if value is None else str(value))
+        pending.append(email)
+        if len(pending) >= BATCH_SIZE:
+            IncomingEmail.objects.bulk_update(pending, target)
+            pending = []
+    if pending:
+        IncomingEmail.objects.bulk_update(pending, target)
+
+
+def compress_bodies(apps, schema_editor):
+    copy_bodies(apps, ('content', 'html_content'), ('content_compressed', 'html_content_compressed'))
+
+
+def decompress_bodies(apps, schema_editor):
+    copy_bodies(apps, ('content_compressed', 'html_content_compressed'), ('content', 'html_content'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_incomingemail_updated_at'),
+    ]
+
+    operations = [
+        # Nullable while both copies exist, so unapplying can re-add the column
+        migrations.AlterField(
+            model_name='incomingemail',
+            name='content',
+            field=models.TextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='incomingemail',
+            name='content_compressed',
+            field=core.fields.CompressedTextField(null=True),
+        ),
+        migrations.AddField(
+            model_name='incomingemail',
+            name='html_content_compressed',
+            field=core.fields.CompressedTextField(blank=True, null=True),
+        ),
+        migrations.RunPython(compress_bodies, decompress_bodies),
+        migrations.RemoveField(
+            model_name='incomingemail',
+            name='content',
+        ),
+        migrations.RemoveField(
+            model_name='incomingemail',
+            name='html_content',
+        ),
+        migrations.RenameField(
+            model_name='incomingemail',
+            old_name='content_compressed',
+            new_name='content',
+        ),
+        migrations.RenameField(
+            model_name='incomingemail',
+            old_name='html_content_compressed',
+            new_name='html_content',
+        ),
+        migrations.AlterField(
+            model_name='incomingemail',
+            name='content',
+            field=core.fields.CompressedTextField(),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:30
+
+import core.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_compress_incomingemail_bodies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sender_email', models.EmailField(max_length=254)),
+                ('subject', models.CharField(max_length=255)),
+                ('content', core.fields.CompressedTextField()),
+                ('html_content', core.fields.CompressedTextField(blank=True, null=True)),
+                ('received_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], max_length=20)),
+                ('original_email_id', models.CharField(max_length=255, unique=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('has_attachments', models.BooleanField(default=False)),
+                ('attachments', models.JSONField(blank=True, default=list)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Email',
+                'verbose_name_plural': 'Archived Emails',
+                'ordering': ['-received_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='incomingemail',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-received_at'], name='incomingemail_pending_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedemail',
+            name='approved_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_emails', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedemail',
+            index=models.Index(fields=['-received_at'], name='archivedemail_received_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Case, ExpressionWrapper, F, Q, When
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
+from core.fields import CompressedTextField
 
 class TeamMember(models.Model):
     name = models.CharField(max_length=100)
@@ -18,6 +21,30 @@ class TeamMember(models.Model):
     def __str__(self):
         return f"{self.name} - {self.role}"
 
+class EventQuerySet(models.QuerySet):
+    def with_status(self, now=None):
+        """Compute ends_at, has_ended, is_full and spots_left in SQL.
+
+        All rows are compared against the same `now`, and the results can be
+        filtered and ordered on like columns. They are set on the instances in
+        place of the Event properties.
+        """
+        now = now or timezone.now()
+        return self.annotate(
+            ends_at=Coalesce('end_date', 'start_date'),
+            has_ended=ExpressionWrapper(Q(ends_at__lt=now), output_field=models.BooleanField()),
+            is_full=ExpressionWrapper(
+                Q(capacity__isnull=False, current_registrations__gte=F('capacity')),
+                output_field=models.BooleanField()
+            ),
+            spots_left=Case(
+                When(capacity__isnull=True, then=None),
+                When(current_registrations__gte=F('capacity'), then=0),
+                default=F('capacity') - F('current_registrations'),
+                output_field=models.IntegerField()
+            ),
+        )
+
 class Event(models.Model):
     EVENT_CATEGORIES = [
         ('SEMINAR', 'Seminar'),
@@ -47,29 +74,57 @@ class Event(models.Model):
     is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = EventQuerySet.as_manager()
+
+    # Values annotated by EventQuerySet.with_status(), dropped on save
+    STATUS_ANNOTATIONS = ('_has_ended', '_is_full', '_spots_left')
     
     class Meta:
         ordering = ['-start_date']
         
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        for name in self.STATUS_ANNOTATIONS:
+            self.__dict__.pop(name, None)
     
     @property
     def is_full(self):
+        if '_is_full' in self.__dict__:
+            return self._is_full
         if self.capacity is None:
             return False
         return self.current_registrations >= self.capacity
+
+    @is_full.setter
+    def is_full(self, value):
+        self._is_full = value
     
     @property
     def spots_left(self):
+        if '_spots_left' in self.__dict__:
+            return self._spots_left
         if self.capacity is None:
             return None
         return max(0, self.capacity - self.current_registrations)
+
+    @spots_left.setter
+    def spots_left(self, value):
+        self._spots_left = value
     
     @property
     def has_ended(self):
+        if '_has_ended' in self.__dict__:
+            return self._has_ended
         return timezone.now() > (self.end_date or self.start_date)
 
+    @has_ended.setter
+    def has_ended(self, value):
+        self._has_ended = value
+
 class Article(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
@@ -113,8 +168,9 @@ class IncomingEmail(models.Model):
 
     sender_email = models.EmailField()
     subject = models.CharField(max_length=255)
-    content = models.TextField()
-    html_content = models.TextField(blank=True, null=True)  # For HTML emails
+    # Bodies are stored zlib-compressed and decompressed on first access
+    content = CompressedTextField()
+    html_content = CompressedTextField(blank=True, null=True)  # For HTML emails
     received_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     original_email_id = models.CharField(max_length=255, unique=True)  # Gmail message ID
@@ -127,6 +183,7 @@ class IncomingEmail(models.Model):
     )
     approved_at = models.DateTimeField(null=True, blank=True)
     sent_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Part of the preview cache key
     
     # Fields for attachments
     has_attachments = models.BooleanField(default=False)
@@ -136,6 +193,70 @@ class IncomingEmail(models.Model):
         ordering = ['-received_at']
         verbose_name = 'Incoming Email'
         verbose_name_plural = 'Incoming Emails'
+        indexes = [
+            # The approval queue; stays small however many emails pile up
+            models.Index(
+                fields=['-received_at'],
+                name='incomingemail_pending_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} - {self.sender_email} ({self.status})"
+
+class ArchivedEmail(models.Model):
+    """A sent or rejected IncomingEmail moved out of the hot table by archive_emails."""
+    sender_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    content = CompressedTextField()
+    html_content = CompressedTextField(blank=True, null=True)
+    received_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=IncomingEmail.STATUS_CHOICES)
+    original_email_id = models.CharField(max_length=255, unique=True)  # Gmail message ID
+    approved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_emails'
+    )
+    approved_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    has_attachments = models.BooleanField(default=False)
+    attachments = models.JSONField(default=list, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-received_at']
+        verbose_name = 'Archived Email'
+        verbose_name_plural = 'Archived Emails'
+        indexes = [models.Index(fields=['-received_at'], name='archivedemail_received_idx')]
 
     def __str__(self):
         return f"{self.subject} - {self.sender_email} ({self.status})"
+
+class MailboxSync(models.Model):
+    """Lease row for mailbox syncs, plus the outcome of the last finished run.
+
+    A trigger takes the lease by setting run_id while no unexpired lease exists.
+    Concurrent triggers wait for that run and share its result.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    run_id = models.UUIDField(null=True, blank=True)  # In-flight run, if any
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+
+    last_run_id = models.UUIDField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_duration_ms = models.FloatField(null=True, blank=True)
+    last_stored = models.PositiveIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Written by the watch_emails daemon on every poll
+    watcher_heartbeat_at = models.DateTimeField(null=True, blank=True)
+    watcher_interval = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return self.name
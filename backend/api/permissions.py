@@ -1,18 +1,11 @@
 from rest_framework import permissions
+from accounts.permissions import Capability, HasCapability
 
-class IsAdminOrBoardMember(permissions.BasePermission):
+class IsAdminOrBoardMember(HasCapability):
     """
     Custom permission to only allow admins, presidents, and board members to access.
-    """
-    def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        return request.user.role in ['ADMIN', 'PRESIDENT', 'BOARD']
-
-    def has_object_permission(self, request, view, obj):
-        # Read permissions are allowed to any admin, president, or board member
-        if request.method in permissions.SAFE_METHODS:
-            return request.user.role in ['ADMIN', 'PRESIDENT', 'BOARD']
 
-        # Write permissions are only allowed to admins and presidents
-        return request.user.role in ['ADMIN', 'PRESIDENT'] 
\ No newline at end of file
+    Any of them may read or create; changing an existing object requires an admin or president.
+    """
+    capability = Capability.EVENTS_CREATE
+    object_capability = Capability.EVENTS_EDIT
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import TeamMember, Event, Article, MailingListSubscriber, IncomingEmail
+from .models import TeamMember, Event, Article, MailingListSubscriber, IncomingEmail, ArchivedEmail
 from accounts.serializers import UserSerializer
 from django.contrib.auth import get_user_model
+import logging
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
@@ -65,12 +67,10 @@ class MailingListSubscriberSerializer(serializers.ModelSerializer):
         # Check if email already exists for active subscribers
         existing = MailingListSubscriber.objects.filter(email=value, is_active=True).first()
         if existing:
-            print(f"Email {value} already exists and is active")  # Debug print
             raise serializers.ValidationError("This email is already subscribed to our mailing list.")
         return value.lower()  # Store emails in lowercase
 
     def validate(self, data):
-        print(f"Validating subscription data: {data}")  # Debug print
         # Ensure required fields are present
         required_fields = ['email', 'first_name', 'last_name']
         for field in required_fields:
@@ -79,14 +79,16 @@ class MailingListSubscriberSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        print(f"Creating subscriber with data: {validated_data}")  # Debug print
         try:
             return super().create(validated_data)
-        except Exception as e:
-            print(f"Error creating subscriber: {str(e)}")  # Debug print
+        except Exception:
+            logger.exception("Error creating subscriber")
             raise
 
 class IncomingEmailSerializer(serializers.ModelSerializer):
+    # Compressed binary columns on the model, plain text in the API
+    content = serializers.CharField(read_only=True)
+    html_content = serializers.CharField(read_only=True, allow_null=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
 
@@ -95,11 +97,34 @@ class IncomingEmailSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'sender_email', 'subject', 'content', 'html_content',
             'received_at', 'status', 'status_display', 'approved_by',
-            'approved_by_name', 'approved_at', 'sent_at', 'has_attachments',
-            'attachments'
+            'approved_by_name', 'approved_at', 'sent_at', 'updated_at',
+            'has_attachments', 'attachments'
         ]
         read_only_fields = [
             'sender_email', 'subject', 'content', 'html_content',
             'received_at', 'approved_by', 'approved_at', 'sent_at',
-            'has_attachments', 'attachments'
+            'updated_at', 'has_attachments', 'attachments'
+        ]
+
+class ArchivedEmailListSerializer(serializers.ModelSerializer):
+    """Archive listing without the bodies, which stay compressed in the database."""
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ArchivedEmail
+        fields = [
+            'id', 'sender_email', 'subject', 'received_at', 'status', 'status_display',
+            'approved_by', 'approved_at', 'sent_at', 'archived_at', 'has_attachments'
+        ]
+        read_only_fields = fields
+
+class ArchivedEmailSerializer(ArchivedEmailListSerializer):
+    content = serializers.CharField(read_only=True)
+    html_content = serializers.CharField(read_only=True, allow_null=True)
+    approved_by_name = serializers.CharField(source='approved_by.get_full_name', read_only=True)
+
+    class Meta(ArchivedEmailListSerializer.Meta):
+        fields = ArchivedEmailListSerializer.Meta.fields + [
+            'content', 'html_content', 'approved_by_name', 'original_email_id', 'attachments'
         ]
+        read_only_fields = fields
@@ -0,0 +1,18 @@
+"""
+Entry points for the ingest_backlog process pool.
+
+Kept free of model imports so spawned workers can unpickle them before
+django.setup() has run.
+"""
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def build_record(job):
+    from .gmail_service import build_email_record
+
+    msg, sender_email, subject = job
+    return build_email_record(msg, sender_email, subject)
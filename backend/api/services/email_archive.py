@@ -0,0 +1,81 @@
+"""
+Moves emails that were sent or rejected long ago out of IncomingEmail.
+
+The approval queue and the moderation screens only work on recent emails, so
+old ones are copied into ArchivedEmail and deleted from the hot table. Bodies
+are copied as the stored compressed bytes, without decompressing them.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.metrics import counter, span
+from ..models import ArchivedEmail, IncomingEmail
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER_DAYS = getattr(settings, 'EMAIL_ARCHIVE_AFTER_DAYS', 90)
+ARCHIVE_BATCH_SIZE = 500
+
+ARCHIVED_FIELDS = [
+    'sender_email', 'subject', 'content', 'html_content', 'received_at', 'status',
+    'original_email_id', 'approved_by_id', 'approved_at', 'sent_at', 'has_attachments',
+    'attachments',
+]
+
+emails_archived = counter('emails_archived_total', 'Emails moved to the archive table')
+
+
+def archivable(older_than_days=ARCHIVE_AFTER_DAYS):
+    """Emails sent, or rejected, more than older_than_days ago."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return IncomingEmail.objects.filter(
+        Q(status='REJECTED', approved_at__lt=cutoff)
+        | Q(status='APPROVED', sent_at__lt=cutoff)
+    )
+
+
+def archive_batch(ids):
+    """Copy one batch into the archive and delete it from IncomingEmail, atomically."""
+    with transaction.atomic():
+        # Rows a moderator is editing right now are left for the next run
+        locked = list(
+            IncomingEmail.objects.filter(pk__in=ids)
+            .select_for_update(skip_locked=True)
+            .values_list('pk', flat=True)
+        )
+        if not locked:
+            return 0
+        rows = IncomingEmail.objects.filter(pk__in=locked).values(*ARCHIVED_FIELDS)
+        ArchivedEmail.objects.bulk_create(
+            [ArchivedEmail(**row) for row in rows], ignore_conflicts=True
+        )
+        IncomingEmail.objects.filter(pk__in=locked).delete()
+    return len(locked)
+
+
+def archive_emails(older_than_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE, dry_run=False):
+    """Archive everything archivable in batches. Returns how many emails were (or would be) moved."""
+    candidates = archivable(older_than_days).order_by('pk').values_list('pk', flat=True)
+    if dry_run:
+        return candidates.count()
+
+    archived = 0
+    last_pk = 0
+    with span('email_archive'):
+        while True:
+            ids = list(candidates.filter(pk__gt=last_pk)[:batch_size])
+            if not ids:
+                break
+            last_pk = ids[-1]
+            moved = archive_batch(ids)
+            archived += moved
+            emails_archived.inc(moved)
+            logger.debug("Archived %d of %d emails up to id %s", moved, len(ids), last_pk)
+
+    logger.info("Archived %d emails older than %d days", archived, older_than_days)
+    return archived
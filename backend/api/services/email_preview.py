@@ -0,0 +1,138 @@
+"""
+Cheap previews of incoming emails for the approval screens.
+
+The stored html_content carries the inlined logo and the whole CSS shell. A
+preview keeps only the sender's content, capped in size, plus a text snippet
+and an attachment summary. It is rendered once per email version (id and
+updated_at) and then served from the cache.
+"""
+import re
+
+import nh3
+from django.core.cache import cache
+
+from core.caching import make_etag
+from core.renderers import FastJSONRenderer
+from ..models import IncomingEmail
+from .gmail_service import LOGO_MARKUP_RE
+
+PREVIEW_MAX_HTML = 50 * 1024  # characters
+SNIPPET_LENGTH = 280
+PREVIEW_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Allowlist for preview HTML; everything else is dropped by nh3
+PREVIEW_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'center', 'code', 'div', 'em',
+    'font', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p',
+    'pre', 's', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td',
+    'tfoot', 'th', 'thead', 'tr', 'u', 'ul',
+}
+PREVIEW_ATTRIBUTES = {
+    '*': {'align', 'style', 'title'},
+    'a': {'href'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'font': {'color', 'face', 'size'},
+    'table': {'border', 'cellpadding', 'cellspacing', 'width'},
+    'td': {'colspan', 'rowspan', 'valign', 'width'},
+    'th': {'colspan', 'rowspan', 'valign', 'width'},
+}
+# No data: URIs, so inline images don't bloat the preview
+PREVIEW_URL_SCHEMES = {'http', 'https', 'mailto', 'cid'}
+PREVIEW_STYLE_PROPERTIES = {
+    'background-color', 'border', 'border-collapse', 'color', 'font-family', 'font-size',
+    'font-style', 'font-weight', 'height', 'line-height', 'margin', 'padding',
+    'text-align', 'text-decoration', 'vertical-align', 'width',
+}
+# Dropped together with their content
+PREVIEW_DROPPED_CONTENT = {'head', 'script', 'style', 'title'}
+BETWEEN_TAGS_RE = re.compile(r'>\s+<')
+
+
+def _cache_key(email):
+    return f'email-preview:v2:{email.pk}:{email.updated_at.timestamp()}'
+
+
+def clean_preview(html):
+    return nh3.clean(
+        html,
+        tags=PREVIEW_TAGS,
+        attributes=PREVIEW_ATTRIBUTES,
+        url_schemes=PREVIEW_URL_SCHEMES,
+        filter_style_properties=PREVIEW_STYLE_PROPERTIES,
+        clean_content_tags=PREVIEW_DROPPED_CONTENT,
+        link_rel='noopener noreferrer',
+    )
+
+
+def preview_html(html_content):
+    """Strip the logo and reduce the HTML to an allowlist of tags, attributes and URL schemes.
+
+    Returns (html, truncated).
+    """
+    html = clean_preview(LOGO_MARKUP_RE.sub('', html_content or ''))
+    html = BETWEEN_TAGS_RE.sub('><', html).strip()
+
+    if len(html) <= PREVIEW_MAX_HTML:
+        return html, False
+    cut = html[:PREVIEW_MAX_HTML]
+    # Don't leave half a tag at the end
+    if cut.rfind('<') > cut.rfind('>'):
+        cut = cut[:cut.rfind('<')]
+    # Close the tags the cut left open
+    return clean_preview(cut), True
+
+
+def text_snippet(content):
+    text = ' '.join((content or '').split())
+    if len(text) <= SNIPPET_LENGTH:
+        return text
+    return text[:SNIPPET_LENGTH].rsplit(' ', 1)[0] + '…'
+
+
+def attachment_summary(attachments):
+    attachments = attachments or []
+    return {
+        'count': len(attachments),
+        'total_size': sum(a.get('size') or 0 for a in attachments),
+        'items': [
+            {
+                'filename': a.get('filename'),
+                'size': a.get('size'),
+                'content_type': a.get('content_type'),
+                'url': a.get('url'),
+            }
+            for a in attachments
+        ],
+    }
+
+
+def render_preview(email):
+    html, truncated = preview_html(email.html_content)
+    return {
+        'id': email.pk,
+        'subject': email.subject,
+        'sender_email': email.sender_email,
+        'status': email.status,
+        'received_at': email.received_at,
+        'updated_at': email.updated_at,
+        'html': html,
+        'html_truncated': truncated,
+        'snippet': text_snippet(email.content),
+        'attachments': attachment_summary(email.attachments),
+    }
+
+
+def get_preview(email):
+    """The rendered preview JSON and its ETag, from the cache when possible.
+
+    `email` only needs pk and updated_at loaded; the full row is fetched on a miss.
+    """
+    key = _cache_key(email)
+    cached = cache.get(key)
+    if cached is None:
+        if email.get_deferred_fields():
+            email = IncomingEmail.objects.get(pk=email.pk)
+        content = FastJSONRenderer().render(render_preview(email))
+        cached = {'content': content, 'etag': make_etag(content)}
+        cache.set(key, cached, PREVIEW_CACHE_TIMEOUT)
+    return cached
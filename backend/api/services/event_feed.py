@@ -0,0 +1,137 @@
+"""
+iCalendar feed of the public (active) events.
+
+Each event's VEVENT is rendered once per version (id and updated_at) and kept
+in the cache, so rebuilding the feed after one event changed only renders that
+event. The assembled feed is cached per category under the event feed
+generation, which signals bump only when an active event changes; polling
+clients are answered from the cache, usually with a 304.
+
+Last-Modified is the later of the newest event's updated_at and the time the
+feed last changed, so deleting or deactivating an event moves it forward too.
+"""
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+from core.caching import bump_generation, get_generation, make_etag
+from ..models import Event
+
+EVENT_FEED_NAMESPACE = 'event-feed'
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+VEVENT_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+PRODID = '-//Asian Crossroads//Events//EN'
+UID_DOMAIN = 'asiancrossroads'
+
+_CHANGED_AT_KEY = f'{EVENT_FEED_NAMESPACE}:changed-at'
+
+
+def feed_changed():
+    """Invalidate the cached feeds and record when the feed changed."""
+    cache.set(_CHANGED_AT_KEY, datetime.now(timezone.utc), None)
+    bump_generation(EVENT_FEED_NAMESPACE)
+
+
+def feed_changed_at():
+    # If the entry was evicted, start over from now: a later Last-Modified only costs a full download
+    cache.add(_CHANGED_AT_KEY, datetime.now(timezone.utc), None)
+    return cache.get(_CHANGED_AT_KEY)
+
+
+def escape_text(value):
+    return (
+        (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into 75-octet chunks, never inside a UTF-8 character (RFC 5545 3.1)."""
+    if len(line.encode('utf-8')) <= 75:
+        return line
+    chunks, current, size = [], '', 0
+    for char in line:
+        width = len(char.encode('utf-8'))
+        # Continuation lines start with a space, which counts toward their 75
+        if size + width > (75 if not chunks else 74):
+            chunks.append(current)
+            current, size = '', 0
+        current += char
+        size += width
+    chunks.append(current)
+    return '\r\n '.join(chunks)
+
+
+def format_datetime(value):
+    return value.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_vevent(event):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event.pk}@{UID_DOMAIN}',
+        f'DTSTAMP:{format_datetime(event.updated_at)}',
+        f'LAST-MODIFIED:{format_datetime(event.updated_at)}',
+        f'DTSTART:{format_datetime(event.start_date)}',
+    ]
+    if event.end_date:
+        lines.append(f'DTEND:{format_datetime(event.end_date)}')
+    lines += [
+        f'SUMMARY:{escape_text(event.title)}',
+        f'DESCRIPTION:{escape_text(event.description)}',
+        f'LOCATION:{escape_text(event.venue)}',
+        f'CATEGORIES:{escape_text(event.get_category_display())}',
+    ]
+    if event.registration_link:
+        lines.append(f'URL:{event.registration_link}')
+    lines.append('END:VEVENT')
+    return '\r\n'.join(fold(line) for line in lines)
+
+
+def _vevent_key(pk, updated_at):
+    return f'{EVENT_FEED_NAMESPACE}:vevent:{pk}:{updated_at.timestamp()}'
+
+
+def render_feed(category=None):
+    """Assemble the calendar, rendering only the events not cached at their current version."""
+    events = Event.objects.filter(is_active=True).order_by('start_date', 'pk')
+    if category:
+        events = events.filter(category=category)
+    versions = list(events.values_list('pk', 'updated_at'))
+
+    keys = {pk: _vevent_key(pk, updated_at) for pk, updated_at in versions}
+    cached = cache.get_many(keys.values())
+    missing = [pk for pk, key in keys.items() if key not in cached]
+    if missing:
+        rendered = {keys[event.pk]: render_vevent(event) for event in Event.objects.filter(pk__in=missing)}
+        cache.set_many(rendered, VEVENT_CACHE_TIMEOUT)
+        cached.update(rendered)
+
+    body = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Asian Crossroads Events',
+    ]
+    body += [cached[keys[pk]] for pk, _ in versions if keys[pk] in cached]
+    body.append('END:VCALENDAR')
+    last_modified = max((updated_at for _, updated_at in versions), default=None)
+    return ('\r\n'.join(body) + '\r\n').encode('utf-8'), last_modified
+
+
+def get_feed(category=None):
+    """The feed bytes, ETag and Last-Modified, from the cache when nothing changed."""
+    generation = get_generation(EVENT_FEED_NAMESPACE)
+    key = f'{EVENT_FEED_NAMESPACE}:{generation}:{category or "all"}'
+    feed = cache.get(key)
+    if feed is None:
+        changed_at = feed_changed_at()
+        content, last_modified = render_feed(category)
+        if changed_at and (last_modified is None or changed_at > last_modified):
+            last_modified = changed_at
+        feed = {'content': content, 'etag': make_etag(content), 'last_modified': last_modified}
+        cache.set(key, feed, FEED_CACHE_TIMEOUT)
+    return feed
@@ -0,0 +1,331 @@
+"""
+Async Gmail client used by the ASGI email views.
+
+Talks to the Gmail REST API directly over httpx instead of googleapiclient, so
+waiting on Google doesn't hold a worker thread. Building and parsing messages
+reuses the stage functions from gmail_service; DB work is bridged with
+sync_to_async or Django's async queryset methods.
+"""
+import asyncio
+import base64
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from core.metrics import counter, span
+from ..models import IncomingEmail, MailingListSubscriber
+from .gmail_service import (
+    GMAIL_MAX_RETRIES, INGEST_BATCH_SIZE, authorized_senders, build_email_record, build_subscriber_message,
+    emails_ingested, emails_sent, encode_message, get_gmail_credentials, gmail_attachment_id,
+    ingest_failures, parse_sender, persist_new_emails, read_logo_bytes, send_failures, unread_query,
+)
+
+logger = logging.getLogger(__name__)
+
+GMAIL_API_URL = 'https://gmail.googleapis.com/gmail/v1/users/me'
+
+# Max Gmail calls in flight per operation
+GMAIL_CONCURRENCY = getattr(settings, 'GMAIL_ASYNC_CONCURRENCY', 8)
+GMAIL_TIMEOUT = getattr(settings, 'GMAIL_ASYNC_TIMEOUT', 30)
+# messages.send has a much lower per-user quota than reads
+GMAIL_SEND_CONCURRENCY = getattr(settings, 'GMAIL_SEND_CONCURRENCY', 2)
+GMAIL_SENDS_PER_SECOND = getattr(settings, 'GMAIL_SENDS_PER_SECOND', 2)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 32.0
+
+gmail_retries = counter('gmail_api_retries_total', 'Gmail calls retried after a rate limit or server error')
+
+_credentials = None
+
+
+def is_retryable(response):
+    if response.status_code in RETRY_STATUSES:
+        return True
+    if response.status_code == 403:
+        try:
+            errors = response.json().get('error', {}).get('errors', [])
+        except ValueError:
+            return False
+        return any(error.get('reason') in RATE_LIMIT_REASONS for error in errors)
+    return False
+
+
+def retry_delay(attempt, response=None):
+    """Retry-After when Gmail sends one, else exponential backoff with jitter."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), BACKOFF_MAX)
+    return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+class SendPacer:
+    """Spaces out sends to at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def access_token():
+    """A valid OAuth access token; loading/refreshing runs in a worker thread."""
+    global _credentials
+    creds = _credentials
+    if creds is None or not creds.valid:
+        creds = await sync_to_async(get_gmail_credentials, thread_sensitive=False)()
+        _credentials = creds
+    return creds.token
+
+
+class AsyncGmailClient:
+    """The subset of the Gmail API the email pipeline uses."""
+
+    def __init__(self, token, http):
+        self.token = token
+        self.http = http
+
+    async def request(self, method, verb, path, **kwargs):
+        """Call Gmail, retrying rate limits, server errors and dropped connections with backoff."""
+        global _credentials
+        for attempt in range(GMAIL_MAX_RETRIES + 1):
+            last_attempt = attempt == GMAIL_MAX_RETRIES
+            try:
+                with span('gmail_api', method=method):
+                    response = await self.http.request(
+                        verb,
+                        f'{GMAIL_API_URL}{path}',
+                        headers={'Authorization': f'Bearer {self.token}'},
+                        **kwargs
+                    )
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                response = None
+            if response is None or (is_retryable(response) and not last_attempt):
+                gmail_retries.inc(method=method)
+                await asyncio.sleep(retry_delay(attempt, response))
+                continue
+            if response.status_code == 401:
+                # Token revoked or expired early, reload it on the next call
+                _credentials = None
+            response.raise_for_status()
+            return response.json() if response.content else {}
+
+    async def list_messages(self, q, label_ids, page_size=500, page_token=None):
+        params = {'q': q, 'labelIds': label_ids, 'maxResults': page_size}
+        if page_token:
+            params['pageToken'] = page_token
+        return await self.request('messages.list', 'GET', '/messages', params=params)
+
+    async def list_unread_ids(self, q):
+        """Ids of every unread message matching q, following pagination."""
+        message_ids = []
+        page_token = None
+        while True:
+            results = await self.list_messages(q, ['UNREAD'], page_token=page_token)
+            message_ids.extend(message['id'] for message in results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return message_ids
+
+    async def get_message(self, message_id, format='full', metadata_headers=()):
+        params = {'format': format}
+        if metadata_headers:
+            params['metadataHeaders'] = list(metadata_headers)
+        method = 'messages.get' if format == 'full' else f'messages.get.{format}'
+        return await self.request(method, 'GET', f'/messages/{message_id}', params=params)
+
+    async def batch_modify(self, message_ids, body):
+        return await self.request(
+            'messages.batchModify', 'POST', '/messages/batchModify', json={'ids': message_ids, **body}
+        )
+
+    async def get_attachment(self, message_id, attachment_id):
+        return await self.request(
+            'attachments.get', 'GET', f'/messages/{message_id}/attachments/{attachment_id}'
+        )
+
+    async def send_message(self, raw):
+        return await self.request('messages.send', 'POST', '/messages/send', json={'raw': raw})
+
+
+@asynccontextmanager
+async def gmail_client():
+    """An AsyncGmailClient whose connection pool is closed when the block ends.
+
+    Scoped per operation rather than kept per event loop: under WSGI every
+    async view runs on a fresh loop, and a cached client would leak.
+    """
+    async with httpx.AsyncClient(
+        timeout=GMAIL_TIMEOUT,
+        limits=httpx.Limits(max_connections=GMAIL_CONCURRENCY * 4),
+    ) as http:
+        yield AsyncGmailClient(await access_token(), http)
+
+
+async def fetch_attachment_data(client, email, attachment_meta):
+    """Download the bytes of a stored attachment from Gmail, or None if missing."""
+    attachment = await client.get_attachment(
+        email.original_email_id, gmail_attachment_id(email, attachment_meta)
+    )
+    if attachment and 'data' in attachment:
+        return base64.urlsafe_b64decode(attachment['data'])
+    return None
+
+
+async def check_new_emails(client=None, batch_size=INGEST_BATCH_SIZE):
+    """Async version of gmail_service.check_new_emails; messages are fetched concurrently.
+
+    Messages are fetched and stored batch_size at a time, so memory stays bounded
+    and a failed insert only leaves its own batch unread for the next sync.
+    """
+    if client is None:
+        async with gmail_client() as client:
+            return await check_new_emails(client, batch_size)
+    authorized_lower = await sync_to_async(authorized_senders)()
+    if not authorized_lower:
+        return 0
+
+    message_ids = await client.list_unread_ids(unread_query(authorized_lower))
+    limit = asyncio.Semaphore(GMAIL_CONCURRENCY)
+
+    async def fetch(message_id):
+        # Check the sender from the headers alone before downloading the body
+        async with limit:
+            metadata = await client.get_message(message_id, 'metadata', ('From', 'Subject'))
+        subject, sender_email = parse_sender(metadata['payload']['headers'])
+        if sender_email.lower() not in authorized_lower:
+            logger.debug("Skipping unauthorized sender: %s", sender_email)
+            return None
+
+        async with limit:
+            msg = await client.get_message(message_id)
+        try:
+            return IncomingEmail(**build_email_record(msg, sender_email, subject))
+        except Exception:
+            ingest_failures.inc()
+            logger.exception("Error parsing email %s", message_id)
+            return None
+
+    stored = 0
+    for start in range(0, len(message_ids), batch_size):
+        batch = await asyncio.gather(*(fetch(message_id) for message_id in message_ids[start:start + batch_size]))
+        emails = [email for email in batch if email]
+        if emails:
+            stored += await store_batch(client, emails)
+    return stored
+
+
+async def store_batch(client, emails):
+    """Async version of gmail_service.store_batch."""
+    try:
+        new_emails = await sync_to_async(persist_new_emails)(emails)
+    except Exception:
+        ingest_failures.inc(len(emails))
+        logger.exception("Error storing a batch of %d emails", len(emails))
+        return 0
+
+    # Only after the insert committed
+    stored_ids = [email.original_email_id for email in emails]
+    try:
+        for start in range(0, len(stored_ids), 1000):
+            await client.batch_modify(stored_ids[start:start + 1000], {'removeLabelIds': ['UNREAD']})
+    except Exception:
+        logger.exception("Error marking %d stored emails as read", len(emails))
+
+    for email in new_emails:
+        logger.info("Stored email %s from %s", email.original_email_id, email.sender_email)
+    emails_ingested.inc(len(new_emails))
+    return len(new_emails)
+
+
+async def send_approved_email(email, client=None, sends_per_second=GMAIL_SENDS_PER_SECOND):
+    """Async version of gmail_service.send_approved_email.
+
+    The logo and attachments are fetched once and shared by every subscriber's
+    message. Messages are built in worker threads, and sent GMAIL_SEND_CONCURRENCY
+    at a time and at most sends_per_second (0 for no pacing), retrying rate
+    limits. Returns the number of subscribers sent to.
+    """
+    if client is None:
+        async with gmail_client() as client:
+            return await send_approved_email(email, client, sends_per_second)
+    recipients = [
+        address async for address in
+        MailingListSubscriber.objects.filter(is_active=True).values_list('email', flat=True)
+    ]
+    if not recipients:
+        logger.warning("No active subscribers found, nothing to send")
+        return 0
+
+    try:
+        logo_data = await sync_to_async(read_logo_bytes, thread_sensitive=False)()
+    except Exception:
+        logger.exception("Error attaching inline logo")
+        logo_data = None
+
+    async def fetch(attachment_meta):
+        try:
+            file_data = await fetch_attachment_data(client, email, attachment_meta)
+        except Exception:
+            logger.exception("Error attaching file %s", attachment_meta['filename'])
+            return None
+        if file_data is None:
+            logger.warning("No data found in attachment response for %s", attachment_meta['filename'])
+            return None
+        return attachment_meta, file_data
+
+    attachment_files = []
+    if email.has_attachments and email.attachments:
+        fetched = await asyncio.gather(*(fetch(meta) for meta in email.attachments))
+        attachment_files = [item for item in fetched if item is not None]
+
+    limit = asyncio.Semaphore(GMAIL_SEND_CONCURRENCY)
+    pacer = SendPacer(sends_per_second)
+
+    def build(recipient):
+        return encode_message(build_subscriber_message(email, recipient, logo_data, attachment_files))
+
+    async def deliver(recipient):
+        # Build inside the limit too, so only a few encoded copies exist at a time
+        async with limit:
+            try:
+                raw_message = await sync_to_async(build, thread_sensitive=False)(recipient)
+            except Exception:
+                send_failures.inc(stage='build')
+                logger.exception("Error processing subscriber %s", recipient)
+                return 0
+            try:
+                await pacer.wait()
+                result = await client.send_message(raw_message)
+            except Exception as e:
+                send_failures.inc(stage='gmail')
+                logger.warning("Error from Gmail API while sending to %s: %s", recipient, e)
+                return 0
+        emails_sent.inc()
+        logger.debug("Sent email to %s (Message ID: %s)", recipient, result.get('id'))
+        return 1
+
+    sent = sum(await asyncio.gather(*(deliver(recipient) for recipient in recipients)))
+
+    email.sent_at = timezone.now()
+    await email.asave(update_fields=['sent_at', 'updated_at'])
+    logger.info("Sent email %s to %d of %d subscribers", email.id, sent, len(recipients))
+    return sent
@@ -1,7 +1,10 @@
 import os
 import base64
+import functools
+import multiprocessing
 import pickle
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
@@ -13,28 +16,41 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from ..models import IncomingEmail, MailingListSubscriber
+from core.metrics import counter, span
+from ..models import ArchivedEmail, IncomingEmail, MailingListSubscriber
+from . import backlog_worker
+import logging
 import pathlib
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 SCOPES = ['https://www.googleapis.com/auth/gmail.modify']
 
+emails_ingested = counter('emails_ingested_total', 'Incoming emails stored for approval')
+ingest_failures = counter('email_ingest_failures_total', 'Incoming emails that could not be stored')
+emails_sent = counter('emails_sent_total', 'Approved emails delivered to a subscriber')
+send_failures = counter('email_send_failures_total', 'Subscriber deliveries that failed')
+
 # Create assets directory if it doesn't exist
 ASSETS_DIR = os.path.join(settings.BASE_DIR, 'assets')
 os.makedirs(ASSETS_DIR, exist_ok=True)
 
+@functools.lru_cache(maxsize=None)
 def get_logo_html(mode="cid"):
     """Get the HTML for the logo.
     
     mode="cid": Returns an <img> tag referencing the logo via a Content-ID.
     mode="datauri": Returns an <img> tag with a data URI (Base64) so the file is self-contained.
+
+    Cached per process, so the logo is read and encoded once rather than per email.
     """
     logo_path = os.path.join(settings.BASE_DIR, 'assets', 'logo.png')
     
     if not os.path.exists(logo_path):
-        print(f"Logo file not found at {logo_path}")
+        logger.warning("Logo file not found at %s", logo_path)
         return ""
         
     if mode == "cid":
@@ -60,7 +76,7 @@ def get_logo_html(mode="cid"):
                     </div>
                 '''
         except Exception as e:
-            print(f"Error reading logo: {str(e)}")
+            logger.exception("Error reading logo")
             return ""
     else:
         return ""
@@ -227,45 +243,39 @@ def get_attachment_metadata(part, message_id):
         'url': f'/api/emails/attachment/{full_attachment_id}/'
     }
 
-def get_gmail_service():
-    """Get an authenticated Gmail service instance."""
+def get_gmail_credentials():
+    """Load (refreshing or creating if needed) the OAuth credentials for the mailbox."""
     creds = None
     token_path = os.path.join(settings.BASE_DIR, 'token.pickle')
     credentials_path = os.path.join(settings.BASE_DIR, 'credentials.json')
 
-    print("Initializing Gmail service...")
+    logger.debug("Initializing Gmail service")
 
     if os.path.exists(token_path):
-        print("Found existing token, loading...")
         with open(token_path, 'rb') as token:
             try:
                 creds = pickle.load(token)
-                print("Token loaded successfully")
             except Exception as e:
-                print(f"Error loading token: {e}")
+                logger.warning("Error loading token: %s", e)
                 creds = None
 
     # Check if credentials are valid
     if creds:
-        print("Checking credentials validity...")
         try:
             if creds.expired:
-                print("Credentials expired, refreshing...")
+                logger.info("Gmail credentials expired, refreshing")
                 if creds.refresh_token:
                     creds.refresh(Request())
-                    print("Credentials refreshed successfully")
                 else:
-                    print("No refresh token available")
+                    logger.warning("No Gmail refresh token available")
                     creds = None
-            else:
-                print("Credentials are valid")
         except Exception as e:
-            print(f"Error checking/refreshing credentials: {e}")
+            logger.warning("Error checking/refreshing Gmail credentials: %s", e)
             creds = None
 
     # If no valid credentials available, create new ones
     if not creds:
-        print("No valid credentials, creating new ones...")
+        logger.info("No valid Gmail credentials, creating new ones")
         if not os.path.exists(credentials_path):
             raise FileNotFoundError(
                 "credentials.json not found. Please download it from Google Cloud Console"
@@ -278,293 +288,487 @@ def get_gmail_service():
                 redirect_uri='http://localhost:8080/'
             )
             creds = flow.run_local_server(port=8080)
-            print("New credentials created successfully")
             
             # Save the credentials for future use
             with open(token_path, 'wb') as token:
                 pickle.dump(creds, token)
-                print("New credentials saved to token.pickle")
+                logger.info("New Gmail credentials saved to token.pickle")
         except Exception as e:
-            print(f"Error creating new credentials: {e}")
+            logger.exception("Error creating new Gmail credentials")
             raise
 
+    return creds
+
+def get_gmail_service():
+    """Get an authenticated Gmail service instance."""
+    creds = get_gmail_credentials()
     try:
         service = build('gmail', 'v1', credentials=creds)
-        print("Gmail service built successfully")
         return service
     except Exception as e:
-        print(f"Error building Gmail service: {e}")
+        logger.exception("Error building Gmail service")
         raise
 
-def check_new_emails():
-    """Check for new emails and store them for approval."""
-    service = get_gmail_service()
+GMAIL_MAX_RETRIES = getattr(settings, 'GMAIL_MAX_RETRIES', 5)
 
-    try:
-        # Get authorized email addresses
-        authorized_emails = set(User.objects.filter(
+
+def gmail_execute(request, method):
+    """Execute a Gmail API request, timing it into the gmail_api span.
+
+    Rate limits (429, 403 rateLimitExceeded) and 5xx are retried with
+    exponential backoff, up to GMAIL_MAX_RETRIES times.
+    """
+    with span('gmail_api', method=method):
+        return request.execute(num_retries=GMAIL_MAX_RETRIES)
+
+LOGO_CID = 'cid:logo@asiancrossroads'
+LOGO_MARKUP_RE = re.compile(
+    r'<div[^>]*>\s*<img[^>]*alt="Asian Crossroads Logo"[^>]*>\s*</div>',
+    re.IGNORECASE
+)
+
+def parse_sender(headers):
+    """Return (subject, sender_email) from a Gmail header list."""
+    subject = next(h['value'] for h in headers if h['name'] == 'Subject')
+    sender = next(h['value'] for h in headers if h['name'] == 'From')
+    sender_email = sender.split('<')[-1].strip('>')
+    return subject, sender_email
+
+def sanitize_html(decoded_html):
+    """Strip our logo and any sender font styling from an incoming HTML body."""
+    # Remove any existing logo if present
+    decoded_html = LOGO_MARKUP_RE.sub('', decoded_html)
+
+    # Remove any inline font-family styles, <font> tags, and face="..." attributes
+    decoded_html = re.sub(r'font-family\s*:[^;"]+;?', '', decoded_html, flags=re.IGNORECASE)
+    decoded_html = re.sub(r'\sface="[^"]*"', '', decoded_html, flags=re.IGNORECASE)
+    decoded_html = re.sub(r'</?font[^>]*>', '', decoded_html, flags=re.IGNORECASE)
+    return decoded_html
+
+def html_to_text(html_content):
+    """Build a plain text fallback from an HTML body."""
+    content = re.sub(r'<br\s*/?>', '\n', html_content)
+    content = re.sub(r'</div>\s*<div[^>]*>', '\n\n', content)
+    content = re.sub(r'</p>\s*<p[^>]*>', '\n\n', content)
+    content = re.sub(r'<[^>]+>', '', content)
+    content = re.sub(r'\n{3,}', '\n\n', content)
+    return content.strip()
+
+def process_parts(payload, message_id, sanitize=True):
+    """Walk a Gmail message payload and return (content, html_content, attachments).
+
+    With sanitize=False the HTML body is returned exactly as decoded, which lets
+    callers time decoding and sanitizing separately.
+    """
+    content = ""
+    html_content = None
+    attachments = []
+
+    def walk(part):
+        nonlocal content, html_content
+
+        # Handle single part message
+        if 'body' in part and part['body'].get('data'):
+            if part['mimeType'] == 'text/plain':
+                content = base64.urlsafe_b64decode(
+                    part['body']['data']
+                ).decode('utf-8')
+            elif part['mimeType'] == 'text/html':
+                decoded_html = base64.urlsafe_b64decode(
+                    part['body']['data']
+                ).decode('utf-8')
+                html_content = sanitize_html(decoded_html) if sanitize else decoded_html
+
+        # Handle attachment in the current part
+        if ('filename' in part and part['filename']) or ('name' in part and part['name']):
+            attachment_meta = get_attachment_metadata(part, message_id)
+            if attachment_meta:
+                attachments.append(attachment_meta)
+                logger.debug("Found attachment: %s", attachment_meta['filename'])
+
+        # Process child parts recursively
+        if 'parts' in part:
+            for child in part['parts']:
+                walk(child)
+
+    walk(payload)
+    return content, html_content, attachments
+
+def build_email_record(msg, sender_email, subject):
+    """Turn a full Gmail message into the field values of an IncomingEmail."""
+    content, html_content, attachments = process_parts(msg['payload'], msg['id'])
+
+    # If no plain text content but have HTML, create a plain text version
+    if not content and html_content:
+        content = html_to_text(html_content)
+
+    # Create HTML version with logo and styling (all Merriweather)
+    final_html = add_logo_to_html(
+        html_content if html_content else content,
+        mode="datauri"
+    )
+
+    return {
+        'sender_email': sender_email,
+        'subject': subject,
+        'content': content,
+        'html_content': final_html,
+        'original_email_id': msg['id'],
+        'has_attachments': bool(attachments),
+        'attachments': attachments,
+    }
+
+def authorized_senders():
+    """Lowercased addresses of the users whose emails are accepted for approval."""
+    with span('db_query', op='authorized_senders'):
+        authorized_emails = User.objects.filter(
             role__in=['ADMIN', 'PRESIDENT', 'BOARD']
-        ).values_list('email', flat=True))
-        
-        print(f"Authorized emails: {authorized_emails}")
-        
-        # Get unread messages
-        results = service.users().messages().list(
+        ).values_list('email', flat=True)
+        return {email.lower() for email in authorized_emails}
+
+INGEST_BATCH_SIZE = 200
+
+def persist_new_emails(emails):
+    """Insert the emails that aren't stored yet, all in one transaction.
+
+    Returns the ones inserted. ignore_conflicts covers a concurrent insert of
+    the same Gmail message between the lookup and the insert.
+    """
+    message_ids = [email.original_email_id for email in emails]
+    with span('db_query', op='incoming_email.bulk_create'), transaction.atomic():
+        existing = set(IncomingEmail.objects.filter(
+            original_email_id__in=message_ids
+        ).values_list('original_email_id', flat=True))
+        # A message marked unread again after it was archived isn't stored twice
+        existing.update(ArchivedEmail.objects.filter(
+            original_email_id__in=message_ids
+        ).values_list('original_email_id', flat=True))
+        new_emails = [email for email in emails if email.original_email_id not in existing]
+        IncomingEmail.objects.bulk_create(new_emails, ignore_conflicts=True)
+    return new_emails
+
+def mark_read(service, message_ids):
+    """Remove the UNREAD label from messages, up to 1000 per batchModify call."""
+    for start in range(0, len(message_ids), 1000):
+        gmail_execute(service.users().messages().batchModify(
+            userId='me',
+            body={'ids': message_ids[start:start + 1000], 'removeLabelIds': ['UNREAD']}
+        ), 'messages.batchModify')
+
+def store_batch(service, emails):
+    """Persist a batch of parsed emails, then mark them read once the insert committed.
+
+    Messages stay unread if the insert fails, so the next sync retries them. If
+    marking read fails the next sync finds them already stored and just marks
+    them again. Returns the number of new emails stored.
+    """
+    try:
+        new_emails = persist_new_emails(emails)
+    except Exception:
+        ingest_failures.inc(len(emails))
+        logger.exception("Error storing a batch of %d emails", len(emails))
+        return 0
+
+    try:
+        mark_read(service, [email.original_email_id for email in emails])
+    except Exception:
+        logger.exception("Error marking %d stored emails as read", len(emails))
+
+    for email in new_emails:
+        logger.info("Stored email %s from %s", email.original_email_id, email.sender_email)
+    emails_ingested.inc(len(new_emails))
+    return len(new_emails)
+
+LIST_ADDRESS = 'asiancrossroads@gmail.com'
+
+def unread_query(authorized_lower):
+    """Gmail search for list mail sent by the given addresses only."""
+    return f'to:{LIST_ADDRESS} from:({" OR ".join(sorted(authorized_lower))})'
+
+def list_unread_ids(service, query, page_size=500):
+    """Ids of every unread message matching query, following pagination."""
+    message_ids = []
+    page_token = None
+    while True:
+        results = gmail_execute(service.users().messages().list(
             userId='me',
             labelIds=['UNREAD'],
-            q='to:asiancrossroads@gmail.com'
-        ).execute()
-        
-        messages = results.get('messages', [])
-        
-        for message in messages:
-            msg = service.users().messages().get(
-                userId='me',
-                id=message['id'],
-                format='full'
-            ).execute()
-            
-            headers = msg['payload']['headers']
-            subject = next(h['value'] for h in headers if h['name'] == 'Subject')
-            sender = next(h['value'] for h in headers if h['name'] == 'From')
-            sender_email = sender.split('<')[-1].strip('>')
-            
-            # Skip if sender is not authorized
-            if sender_email.lower() not in {email.lower() for email in authorized_emails}:
-                print(f"Skipping unauthorized sender: {sender_email}")
+            q=query,
+            maxResults=page_size,
+            pageToken=page_token
+        ), 'messages.list')
+        message_ids.extend(message['id'] for message in results.get('messages', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            return message_ids
+
+def fetch_if_authorized(service, message_id, authorized_lower):
+    """Fetch the full message only if its sender is authorized.
+
+    Gmail's from: search is a fuzzy match, so the From header is checked with
+    a metadata-only fetch before downloading bodies and attachment parts.
+    Returns (msg, sender_email, subject), or None for other senders.
+    """
+    metadata = gmail_execute(service.users().messages().get(
+        userId='me',
+        id=message_id,
+        format='metadata',
+        metadataHeaders=['From', 'Subject']
+    ), 'messages.get.metadata')
+
+    subject, sender_email = parse_sender(metadata['payload']['headers'])
+    if sender_email.lower() not in authorized_lower:
+        logger.debug("Skipping unauthorized sender: %s", sender_email)
+        return None
+
+    msg = gmail_execute(service.users().messages().get(
+        userId='me',
+        id=message_id,
+        format='full'
+    ), 'messages.get')
+    return msg, sender_email, subject
+
+def check_new_emails(service=None, batch_size=INGEST_BATCH_SIZE):
+    """Check for new emails and store them for approval.
+
+    Parsed emails are saved with one bulk insert per batch and only marked read
+    in Gmail after their batch is stored. Returns the number of emails stored.
+    A pre-built Gmail service (or a fake one for benchmarks) can be passed in;
+    otherwise one is created.
+    """
+    service = service or get_gmail_service()
+    stored = 0
+
+    try:
+        # Get authorized email addresses
+        authorized_lower = authorized_senders()
+
+        logger.debug("Checking mail for %d authorized senders", len(authorized_lower))
+        if not authorized_lower:
+            return stored
+
+        batch = []
+        for message_id in list_unread_ids(service, unread_query(authorized_lower)):
+            fetched = fetch_if_authorized(service, message_id, authorized_lower)
+            if fetched is None:
                 continue
-                
-            print(f"Processing authorized email from: {sender_email}")
-            
-            # Process email content and attachments
-            content = ""
-            html_content = None
-            attachments = []
-            
-            def process_parts(payload):
-                nonlocal content, html_content, attachments
-                
-                # Handle single part message
-                if 'body' in payload and payload['body'].get('data'):
-                    if payload['mimeType'] == 'text/plain':
-                        content = base64.urlsafe_b64decode(
-                            payload['body']['data']
-                        ).decode('utf-8')
-                    elif payload['mimeType'] == 'text/html':
-                        decoded_html = base64.urlsafe_b64decode(
-                            payload['body']['data']
-                        ).decode('utf-8')
-                        
-                        # Remove any existing logo if present
-                        decoded_html = re.sub(
-                            r'<div[^>]*>\s*<img[^>]*alt="Asian Crossroads Logo"[^>]*>\s*</div>',
-                            '',
-                            decoded_html,
-                            flags=re.IGNORECASE
-                        )
-
-                        # Remove any inline font-family styles, <font> tags, and face="..." attributes
-                        decoded_html = re.sub(r'font-family\s*:[^;"]+;?', '', decoded_html, flags=re.IGNORECASE)
-                        decoded_html = re.sub(r'\sface="[^"]*"', '', decoded_html, flags=re.IGNORECASE)
-                        decoded_html = re.sub(r'</?font[^>]*>', '', decoded_html, flags=re.IGNORECASE)
-                        
-                        html_content = decoded_html
-                
-                # Handle attachment in the current part
-                if ('filename' in payload and payload['filename']) or ('name' in payload and payload['name']):
-                    attachment_meta = get_attachment_metadata(payload, message['id'])
-                    if attachment_meta:
-                        attachments.append(attachment_meta)
-                        print(f"Found attachment: {attachment_meta['filename']}")
-                
-                # Process child parts recursively
-                if 'parts' in payload:
-                    for part in payload['parts']:
-                        process_parts(part)
-            
-            # Start processing from the root payload
-            process_parts(msg['payload'])
-            
-            # If no plain text content but have HTML, create a plain text version
-            if not content and html_content:
-                # Convert HTML to plain text
-                content = re.sub(r'<br\s*/?>', '\n', html_content)
-                content = re.sub(r'</div>\s*<div[^>]*>', '\n\n', content)
-                content = re.sub(r'</p>\s*<p[^>]*>', '\n\n', content)
-                content = re.sub(r'<[^>]+>', '', content)
-                content = re.sub(r'\n{3,}', '\n\n', content)
-                content = content.strip()
-            
-            # Create HTML version with logo and styling (all Merriweather)
-            final_html = add_logo_to_html(
-                html_content if html_content else content,
-                mode="datauri"
-            )
-            
-            print(f"Found {len(attachments)} attachments")
-            
-            # Store email for approval
+            msg, sender_email, subject = fetched
+
             try:
-                IncomingEmail.objects.create(
-                    sender_email=sender_email,
-                    subject=subject,
-                    content=content,
-                    html_content=final_html,
-                    original_email_id=message['id'],
-                    has_attachments=bool(attachments),
-                    attachments=attachments
-                )
-                
-                # Mark email as read
-                service.users().messages().modify(
-                    userId='me',
-                    id=message['id'],
-                    body={'removeLabelIds': ['UNREAD']}
-                ).execute()
-                
-                print(f"Successfully stored email from: {sender_email}")
-            except Exception as e:
-                print(f"Error storing email: {str(e)}")
+                batch.append(IncomingEmail(**build_email_record(msg, sender_email, subject)))
+            except Exception:
+                ingest_failures.inc()
+                logger.exception("Error parsing email %s", message_id)
                 continue
-            
-    except Exception as e:
-        print(f"Error checking emails: {str(e)}")
+
+            if len(batch) >= batch_size:
+                stored += store_batch(service, batch)
+                batch = []
+
+        if batch:
+            stored += store_batch(service, batch)
+
+    except Exception:
+        logger.exception("Error checking emails")
         raise
 
-def send_approved_email(email_id):
-    """Send approved email to all subscribers."""
-    print(f"\n=== Starting to send approved email {email_id} ===")
-    service = get_gmail_service()
+    return stored
+
+def ingest_backlog(service=None, workers=None, batch_size=INGEST_BATCH_SIZE):
+    """Catch up on a large unread backlog using every core.
+
+    Payloads are fetched here, while decoding, sanitizing and wrapping each body
+    (build_email_record) is fanned out to a process pool. Results are stored
+    with bulk_create in batches. Returns the number of emails stored.
+    """
+    service = service or get_gmail_service()
+    authorized_lower = authorized_senders()
+    if not authorized_lower:
+        return 0
+
+    jobs = []
+    for message_id in list_unread_ids(service, unread_query(authorized_lower)):
+        fetched = fetch_if_authorized(service, message_id, authorized_lower)
+        if fetched is not None:
+            jobs.append(fetched)
+
+    if not jobs:
+        return 0
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    logger.info("Ingesting a backlog of %d emails with %d workers", len(jobs), workers)
+    stored = 0
+    # Spawned rather than forked workers: a fork would share the parent's open DB connection
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=backlog_worker.init_worker,
+    ) as pool:
+        batch = []
+        records = pool.map(backlog_worker.build_record, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+        for record in records:
+            batch.append(IncomingEmail(**record))
+            if len(batch) >= batch_size:
+                stored += store_batch(service, batch)
+                batch = []
+        if batch:
+            stored += store_batch(service, batch)
+
+    return stored
+
+def read_logo_bytes():
+    """Read the raw logo image that is attached inline to outgoing emails."""
+    logo_path = os.path.join(settings.BASE_DIR, 'assets', 'logo.png')
+    with open(logo_path, 'rb') as f:
+        return f.read()
+
+def gmail_attachment_id(email, attachment_meta):
+    """Strip the message id prefix from a stored attachment id (message_id_attachment_id)."""
+    message_id_length = len(email.original_email_id) + 1
+    return attachment_meta['attachment_id'][message_id_length:]
+
+def fetch_attachment_data(service, email, attachment_meta):
+    """Download the bytes of a stored attachment from Gmail, or None if missing."""
+    attachment = gmail_execute(service.users().messages().attachments().get(
+        userId='me',
+        messageId=email.original_email_id,
+        id=gmail_attachment_id(email, attachment_meta)
+    ), 'attachments.get')
+
+    if attachment and 'data' in attachment:
+        return base64.urlsafe_b64decode(attachment['data'])
+    return None
+
+def build_subscriber_message(email, recipient, logo_data=None, attachment_files=()):
+    """Build the MIME message sent to a single subscriber.
+
+    attachment_files is a sequence of (attachment_meta, file_data) pairs.
+    """
+    message = MIMEMultipart('mixed')
+    message['Subject'] = email.subject
+    message['From'] = 'Asian Crossroads <asiancrossroads@gmail.com>'
+    message['To'] = recipient
+    message['X-Auto-Response-Suppress'] = 'OOF, AutoReply'
+    message['Precedence'] = 'bulk'
+    message['X-Priority'] = '3'
+    message['X-MSMail-Priority'] = 'Normal'
+
+    # Create the HTML/plain-text alternative part
+    alt_part = MIMEMultipart('alternative')
+
+    # Add plain text part
+    text_part = MIMEText(email.content, 'plain', 'utf-8')
+    alt_part.attach(text_part)
+
+    # Use the stored HTML content but replace data URI with CID for the logo
+    html_content = re.sub(
+        r'data:image/png;base64,[^"]*',
+        LOGO_CID,
+        email.html_content
+    )
+    html_part = MIMEText(html_content, 'html', 'utf-8')
+    alt_part.attach(html_part)
+    message.attach(alt_part)
+
+    # Attach the logo image as an inline attachment for CID reference
+    if logo_data:
+        logo_img = MIMEImage(logo_data, _subtype="png")
+        logo_img.add_header('Content-ID', '<logo@asiancrossroads>')
+        logo_img.add_header('Content-Disposition', 'inline', filename="logo.png")
+        message.attach(logo_img)
+
+    for attachment_meta, file_data in attachment_files:
+        main_type, sub_type = attachment_meta['content_type'].split('/', 1)
+        att_part = MIMEBase(main_type, sub_type)
+        att_part.set_payload(file_data)
+        encoders.encode_base64(att_part)
+
+        att_part.add_header(
+            'Content-Disposition',
+            'attachment',
+            filename=attachment_meta['filename']
+        )
+        message.attach(att_part)
+
+    return message
+
+def encode_message(message):
+    """Encode a MIME message into the base64url form the Gmail send API expects."""
+    return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+
+def send_approved_email(email_id, service=None):
+    """Send approved email to all subscribers.
+
+    Returns the number of subscribers the email was sent to.
+    """
+    logger.info("Sending approved email %s", email_id)
+    service = service or get_gmail_service()
+    sent = 0
     try:
         email = IncomingEmail.objects.get(id=email_id)
-        print(f"Found email: subject='{email.subject}', from={email.sender_email}")
     except IncomingEmail.DoesNotExist:
-        print(f"Error: Email with ID {email_id} not found")
+        logger.error("Email with ID %s not found", email_id)
         raise
-    
+
     try:
         subscribers = MailingListSubscriber.objects.filter(is_active=True)
         subscriber_count = subscribers.count()
-        print(f"Found {subscriber_count} active subscribers")
         if subscriber_count == 0:
-            print("Warning: No active subscribers found!")
-            return
+            logger.warning("No active subscribers found, nothing to send")
+            return sent
     except Exception as e:
-        print(f"Error getting subscribers: {str(e)}")
+        logger.exception("Error getting subscribers")
         raise
-    
+
     # Loop through subscribers and send the email with inline logo using CID
     for subscriber in subscribers:
-        print(f"\n--- Processing subscriber: {subscriber.email} ---")
         try:
-            message = MIMEMultipart('mixed')
-            message['Subject'] = email.subject
-            message['From'] = 'Asian Crossroads <asiancrossroads@gmail.com>'
-            message['To'] = subscriber.email
-            message['X-Auto-Response-Suppress'] = 'OOF, AutoReply'
-            message['Precedence'] = 'bulk'
-            message['X-Priority'] = '3'
-            message['X-MSMail-Priority'] = 'Normal'
-            
-            # Create the HTML/plain-text alternative part
-            alt_part = MIMEMultipart('alternative')
-            
-            # Add plain text part
-            print("Adding plain text content...")
-            text_content = email.content
-            text_part = MIMEText(text_content, 'plain', 'utf-8')
-            alt_part.attach(text_part)
-            
-            # Use the stored HTML content but replace data URI with CID for the logo
-            print("Creating HTML content with logo...")
-            html_content = re.sub(
-                r'data:image/png;base64,[^"]*',
-                'cid:logo@asiancrossroads',
-                email.html_content
-            )
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            alt_part.attach(html_part)
-            message.attach(alt_part)
-            
-            # Attach the logo image as an inline attachment for CID reference
             try:
-                logo_path = os.path.join(settings.BASE_DIR, 'assets', 'logo.png')
-                with open(logo_path, 'rb') as f:
-                    logo_data = f.read()
-                logo_img = MIMEImage(logo_data, _subtype="png")
-                logo_img.add_header('Content-ID', '<logo@asiancrossroads>')
-                logo_img.add_header('Content-Disposition', 'inline', filename="logo.png")
-                message.attach(logo_img)
+                logo_data = read_logo_bytes()
             except Exception as e:
-                print(f"Error attaching inline logo: {str(e)}")
-            
+                logger.exception("Error attaching inline logo")
+                logo_data = None
+
             # Add additional attachments if any
+            attachment_files = []
             if email.has_attachments and email.attachments:
-                print(f"Processing {len(email.attachments)} attachments")
                 for attachment_meta in email.attachments:
                     try:
-                        print(f"Processing attachment: {attachment_meta['filename']}")
-                        attachment_id = attachment_meta['attachment_id']
-                        message_id_length = len(email.original_email_id) + 1
-                        attachment_id_only = attachment_meta['attachment_id'][message_id_length:]
-                        
-                        print(f"Using message_id: {email.original_email_id}")
-                        print(f"Using attachment_id: {attachment_id_only}")
-                        
-                        attachment = service.users().messages().attachments().get(
-                            userId='me',
-                            messageId=email.original_email_id,
-                            id=attachment_id_only
-                        ).execute()
-                        
-                        if attachment and 'data' in attachment:
-                            file_data = base64.urlsafe_b64decode(attachment['data'])
-                            print(f"Successfully retrieved attachment data, size: {len(file_data)} bytes")
-                            
-                            main_type, sub_type = attachment_meta['content_type'].split('/', 1)
-                            att_part = MIMEBase(main_type, sub_type)
-                            att_part.set_payload(file_data)
-                            encoders.encode_base64(att_part)
-                            
-                            att_part.add_header(
-                                'Content-Disposition',
-                                'attachment',
-                                filename=attachment_meta['filename']
-                            )
-                            message.attach(att_part)
-                            print(f"Successfully attached {attachment_meta['filename']}")
+                        file_data = fetch_attachment_data(service, email, attachment_meta)
+                        if file_data is not None:
+                            attachment_files.append((attachment_meta, file_data))
                         else:
-                            print(f"Warning: No data found in attachment response for {attachment_meta['filename']}")
+                            logger.warning("No data found in attachment response for %s", attachment_meta['filename'])
                     except Exception as e:
-                        print(f"Error attaching file {attachment_meta['filename']}: {str(e)}")
+                        logger.exception("Error attaching file %s", attachment_meta['filename'])
                         continue
-            
-            print("Encoding message...")
-            try:
-                raw_message = base64.urlsafe_b64encode(
-                    message.as_bytes()
-                ).decode('utf-8')
-            except Exception as e:
-                print(f"Error encoding message: {str(e)}")
-                raise
-            
-            print("Sending message...")
+
+            message = build_subscriber_message(
+                email, subscriber.email, logo_data, attachment_files
+            )
+
+            raw_message = encode_message(message)
+
             try:
-                result = service.users().messages().send(
+                result = gmail_execute(service.users().messages().send(
                     userId='me',
                     body={'raw': raw_message}
-                ).execute()
-                print(f"Successfully sent email to {subscriber.email} (Message ID: {result.get('id')})")
+                ), 'messages.send')
+                sent += 1
+                emails_sent.inc()
+                logger.debug("Sent email to %s (Message ID: %s)", subscriber.email, result.get('id'))
             except Exception as e:
-                print(f"Error from Gmail API while sending to {subscriber.email}: {str(e)}")
+                send_failures.inc(stage='gmail')
+                logger.warning("Error from Gmail API while sending to %s: %s", subscriber.email, e)
                 continue
-            
-        except Exception as e:
-            print(f"Error processing subscriber {subscriber.email}: {str(e)}")
+
+        except Exception:
+            send_failures.inc(stage='build')
+            logger.exception("Error processing subscriber %s", subscriber.email)
             continue
-    
+
     # Update email status
-    print("\nUpdating email status...")
     email.sent_at = timezone.now()
     email.save()
-    print("=== Email sending process completed ===\n")
+    logger.info("Sent email %s to %d of %d subscribers", email_id, sent, subscriber_count)
+    return sent
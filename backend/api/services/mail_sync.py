@@ -0,0 +1,250 @@
+"""
+Coordinates mailbox syncs across processes with a lease row.
+
+Whoever takes the MailboxSync lease runs the sync; triggers that arrive while a
+run is in flight wait for it and return its result instead of listing and
+fetching the same messages again. A lease left behind by a crashed process
+expires after MAIL_SYNC_LEASE_SECONDS; a live run renews it every third of that,
+so a long backlog keeps its lease.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager, suppress
+from dataclasses import dataclass
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.metrics import counter, span
+from ..models import MailboxSync
+
+MAILBOX = 'inbox'
+LEASE_SECONDS = getattr(settings, 'MAIL_SYNC_LEASE_SECONDS', 300)
+RENEW_INTERVAL = LEASE_SECONDS / 3
+POLL_INTERVAL = 0.5
+
+logger = logging.getLogger(__name__)
+
+sync_runs = counter('mail_sync_runs_total', 'Mailbox sync triggers by outcome')
+
+
+class SyncFailed(Exception):
+    """The run a trigger waited on failed."""
+
+
+class SyncTimeout(Exception):
+    """Gave up waiting for an in-flight run."""
+
+
+@dataclass
+class SyncResult:
+    run_id: uuid.UUID
+    stored: int
+    duration_ms: float
+    shared: bool  # True when this trigger waited on another trigger's run
+
+
+def _row():
+    try:
+        row, _ = MailboxSync.objects.get_or_create(name=MAILBOX)
+    except IntegrityError:
+        row = MailboxSync.objects.get(name=MAILBOX)
+    return row
+
+
+def acquire():
+    """Try to take the lease. Returns (run_id, True) if taken, else (in-flight run_id, False)."""
+    _row()
+    now = timezone.now()
+    run_id = uuid.uuid4()
+    taken = MailboxSync.objects.filter(name=MAILBOX).filter(
+        Q(run_id__isnull=True) | Q(lease_expires_at__lt=now)
+    ).update(run_id=run_id, started_at=now, lease_expires_at=now + timedelta(seconds=LEASE_SECONDS))
+    if taken:
+        return run_id, True
+    return MailboxSync.objects.values_list('run_id', flat=True).get(name=MAILBOX), False
+
+
+def renew(run_id):
+    """Extend a running sync's lease by LEASE_SECONDS. False if the lease was lost."""
+    return bool(MailboxSync.objects.filter(name=MAILBOX, run_id=run_id).update(
+        lease_expires_at=timezone.now() + timedelta(seconds=LEASE_SECONDS)
+    ))
+
+
+def _lease_lost(run_id):
+    logger.warning("Mailbox sync %s lost its lease; another run may start", run_id)
+
+
+@contextmanager
+def keep_lease(run_id):
+    """Renew the lease from a background thread while the block runs."""
+    stop = threading.Event()
+
+    def renew_until_stopped():
+        try:
+            while not stop.wait(RENEW_INTERVAL):
+                if not renew(run_id):
+                    _lease_lost(run_id)
+                    return
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=renew_until_stopped, name='mail-sync-lease', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+@asynccontextmanager
+async def akeep_lease(run_id):
+    """Async version of keep_lease(), renewing from a task."""
+    async def renew_periodically():
+        while True:
+            await asyncio.sleep(RENEW_INTERVAL)
+            if not await sync_to_async(renew)(run_id):
+                _lease_lost(run_id)
+                return
+
+    task = asyncio.create_task(renew_periodically())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+def finish(run_id, started, stored=None, error=''):
+    """Release the lease and record the run's outcome."""
+    now = timezone.now()
+    duration_ms = (time.perf_counter() - started) * 1000
+    MailboxSync.objects.filter(name=MAILBOX, run_id=run_id).update(
+        run_id=None,
+        lease_expires_at=None,
+        started_at=None,
+        last_run_id=run_id,
+        last_started_at=now - timedelta(milliseconds=duration_ms),
+        last_finished_at=now,
+        last_duration_ms=round(duration_ms, 3),
+        last_stored=stored,
+        last_error=error,
+    )
+    return duration_ms
+
+
+def outcome_of(run_id):
+    """The SyncResult of a finished run, None while it is still running.
+
+    Raises SyncFailed if it failed, and returns False if the run vanished (its
+    lease expired and another run took over), so the caller should retry.
+    """
+    if run_id is None:
+        return False
+    row = MailboxSync.objects.get(name=MAILBOX)
+    if row.last_run_id == run_id:
+        if row.last_error:
+            raise SyncFailed(row.last_error)
+        return SyncResult(run_id, row.last_stored or 0, row.last_duration_ms or 0, shared=True)
+    if row.run_id == run_id and row.lease_expires_at and row.lease_expires_at > timezone.now():
+        return None
+    return False
+
+
+def heartbeat(interval):
+    """Record that the watch_emails daemon is alive and when it polls next."""
+    _row()
+    MailboxSync.objects.filter(name=MAILBOX).update(
+        watcher_heartbeat_at=timezone.now(), watcher_interval=interval
+    )
+
+
+def status():
+    """When the last sync ran, how long it took, and whether one is running now."""
+    row = _row()
+    now = timezone.now()
+    running = row.run_id is not None and row.lease_expires_at and row.lease_expires_at > now
+    watcher_alive = bool(
+        row.watcher_heartbeat_at and row.watcher_interval is not None
+        and now - row.watcher_heartbeat_at < timedelta(seconds=row.watcher_interval * 2 + 30)
+    )
+    return {
+        'running': bool(running),
+        'started_at': row.started_at if running else None,
+        'last_started_at': row.last_started_at,
+        'last_finished_at': row.last_finished_at,
+        'last_duration_ms': row.last_duration_ms,
+        'last_stored': row.last_stored,
+        'last_error': row.last_error or None,
+        'lag_seconds': (now - row.last_finished_at).total_seconds() if row.last_finished_at else None,
+        'watcher': {
+            'alive': watcher_alive,
+            'heartbeat_at': row.watcher_heartbeat_at,
+            'interval_seconds': row.watcher_interval,
+        },
+    }
+
+
+def coordinate(sync, timeout=LEASE_SECONDS):
+    """Run sync() under the lease, or wait for the in-flight run and share its result."""
+    deadline = time.monotonic() + timeout
+    while True:
+        run_id, taken = acquire()
+        if taken:
+            started = time.perf_counter()
+            try:
+                with span('mail_sync'), keep_lease(run_id):
+                    stored = sync()
+            except Exception as e:
+                finish(run_id, started, error=str(e) or e.__class__.__name__)
+                sync_runs.inc(outcome='failed')
+                raise
+            duration_ms = finish(run_id, started, stored=stored)
+            sync_runs.inc(outcome='ran')
+            return SyncResult(run_id, stored, round(duration_ms, 3), shared=False)
+
+        while (result := outcome_of(run_id)) is None:
+            if time.monotonic() > deadline:
+                raise SyncTimeout('Timed out waiting for the running mailbox sync')
+            time.sleep(POLL_INTERVAL)
+        if result:
+            sync_runs.inc(outcome='shared')
+            return result
+
+
+async def acoordinate(sync, timeout=LEASE_SECONDS):
+    """Async version of coordinate() for an async sync callable."""
+    deadline = time.monotonic() + timeout
+    while True:
+        run_id, taken = await sync_to_async(acquire)()
+        if taken:
+            started = time.perf_counter()
+            try:
+                with span('mail_sync'):
+                    async with akeep_lease(run_id):
+                        stored = await sync()
+            except Exception as e:
+                await sync_to_async(finish)(run_id, started, error=str(e) or e.__class__.__name__)
+                sync_runs.inc(outcome='failed')
+                raise
+            duration_ms = await sync_to_async(finish)(run_id, started, stored=stored)
+            sync_runs.inc(outcome='ran')
+            return SyncResult(run_id, stored, round(duration_ms, 3), shared=False)
+
+        while (result := await sync_to_async(outcome_of)(run_id)) is None:
+            if time.monotonic() > deadline:
+                raise SyncTimeout('Timed out waiting for the running mailbox sync')
+            await asyncio.sleep(POLL_INTERVAL)
+        if result:
+            sync_runs.inc(outcome='shared')
+            return result
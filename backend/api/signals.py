@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.signals import TEAM_CACHE_NAMESPACE
+from core.caching import bump_generation
+from .models import Event, TeamMember
+from .services.event_feed import feed_changed
+
+# Saves touching only these don't change what the event feed shows
+FEED_IGNORED_FIELDS = {'current_registrations', 'updated_at'}
+
+
+@receiver(post_save, sender=TeamMember)
+@receiver(post_delete, sender=TeamMember)
+def invalidate_team_roster(sender, instance, **kwargs):
+    bump_generation(TEAM_CACHE_NAMESPACE)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_was_active(sender, instance, **kwargs):
+    # Deactivating an event removes it from the feed, so the feed must change too
+    instance._was_active = bool(
+        instance.pk and not instance.is_active
+        and Event.objects.filter(pk=instance.pk, is_active=True).exists()
+    )
+
+
+@receiver(post_save, sender=Event)
+def invalidate_event_feed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= FEED_IGNORED_FIELDS:
+        return
+    if instance.is_active or getattr(instance, '_was_active', False):
+        feed_changed()
+
+
+@receiver(post_delete, sender=Event)
+def invalidate_event_feed_on_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        feed_changed()
@@ -1,3 +1,45 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .services.email_preview import PREVIEW_MAX_HTML, preview_html
+
+
+class PreviewHtmlTests(SimpleTestCase):
+    def assertInert(self, payload):
+        html, _ = preview_html(payload)
+        lowered = html.lower()
+        self.assertNotIn('javascript', lowered)
+        self.assertNotIn('onerror', lowered)
+        self.assertNotIn('alert', lowered)
+        return html
+
+    def test_event_attribute_without_whitespace(self):
+        self.assertInert('<img/onerror=alert(1) src=x>')
+
+    def test_unquoted_javascript_url(self):
+        self.assertInert('<a href=javascript:alert(1)>click</a>')
+
+    def test_entity_encoded_javascript_url(self):
+        self.assertInert('<a href="jav&#x61;script:alert(1)">click</a>')
+
+    def test_form_action(self):
+        html = self.assertInert('<form action="javascript:alert(1)"><button>go</button></form>')
+        self.assertNotIn('<form', html)
+
+    def test_script_and_style_dropped_with_content(self):
+        html = preview_html('<head><style>p{}</style></head><script>alert(1)</script><p>hi</p>')[0]
+        self.assertEqual(html, '<p>hi</p>')
+
+    def test_data_uri_images_removed(self):
+        html = preview_html('<img src="data:image/png;base64,AAAA" alt="x">')[0]
+        self.assertNotIn('data:', html)
+
+    def test_safe_markup_kept(self):
+        html = preview_html('<p style="color: red; position: fixed">Hi <a href="https://yale.edu">link</a></p>')[0]
+        self.assertIn('href="https://yale.edu"', html)
+        self.assertIn('color', html)
+        self.assertNotIn('position', html)
+
+    def test_truncated_preview_is_well_formed(self):
+        html, truncated = preview_html('<p><b>' + 'x' * PREVIEW_MAX_HTML + '</b></p>')
+        self.assertTrue(truncated)
+        self.assertTrue(html.endswith('</b></p>'))
@@ -2,15 +2,25 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
 from .views.subscriber_views import SubscriberViewSet
-from .views.email_views import IncomingEmailViewSet
+from .views import email_views
+from .views.email_views import ArchivedEmailViewSet, IncomingEmailViewSet
+from .views.event_views import event_feed
 
 router = DefaultRouter()
 router.register('team', views.TeamMemberViewSet)
 router.register('events', views.EventViewSet)
 router.register('articles', views.ArticleViewSet)
 router.register('subscribers', SubscriberViewSet, basename='subscriber')
+# Before 'emails' so archive/ isn't taken for an email id
+router.register('emails/archive', ArchivedEmailViewSet, basename='email-archive')
 router.register('emails', IncomingEmailViewSet, basename='email')
 
 urlpatterns = [
+    # Public calendar subscription, ahead of the router so it isn't read as an event id
+    path('events/feed.ics', event_feed, name='event-feed'),
+    # Async Gmail-bound email actions, ahead of the router so they win over the viewset routes
+    path('emails/check_new/', email_views.check_new, name='email-check-new'),
+    path('emails/<int:pk>/approve/', email_views.approve, name='email-approve'),
+    path('emails/attachment/<str:attachment_id>/', email_views.get_attachment, name='email-get-attachment'),
     path('', include(router.urls)),
 ]
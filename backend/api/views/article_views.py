@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions
 from api.models import Article
 from api.serializers import ArticleSerializer
-from accounts.permissions import IsBoardOrHigher
+from accounts.permissions import Capability, IsBoardOrHigher, has_capability
 
 class ArticleViewSet(viewsets.ModelViewSet):
     queryset = Article.objects.filter(is_published=True)
@@ -10,8 +10,7 @@ class ArticleViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         # Non-board members can only see published articles
-        if not self.request.user.is_authenticated or \
-           self.request.user.role not in ['ADMIN', 'PRESIDENT', 'BOARD']:
+        if not has_capability(self.request, Capability.ARTICLES_VIEW_UNPUBLISHED):
             return Article.objects.filter(is_published=True)
         return Article.objects.all()
 
@@ -3,19 +3,55 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.http import HttpResponse
-from ..models import IncomingEmail
-from ..serializers import IncomingEmailSerializer
-from ..services.gmail_service import check_new_emails, send_approved_email, get_gmail_service
-import base64
-
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from ..models import ArchivedEmail, IncomingEmail
+from ..serializers import ArchivedEmailListSerializer, ArchivedEmailSerializer, IncomingEmailSerializer
+from accounts.permissions import Capability, has_capability, require
+from core.caching import conditional_response
+from core.async_views import async_api_view
+from ..services import gmail_async, mail_sync
+from ..services.email_preview import get_preview
+from asgiref.sync import sync_to_async
+import logging
+
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
-class CanManageEmails(permissions.BasePermission):
-    def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-        return request.user.role in ['ADMIN', 'PRESIDENT', 'BOARD']
+CanManageEmails = require(Capability.EMAILS_MANAGE)
+
+def visible_emails(request, model=IncomingEmail):
+    """Emails (or archived emails) the request's user can see and act on."""
+    user = request.user
+
+    # Get all authorized email addresses
+    if has_capability(request, Capability.EMAILS_MODERATE_ANY):
+        # Admins and Presidents can see all emails
+        authorized_emails = User.objects.filter(
+            role__in=['ADMIN', 'PRESIDENT', 'BOARD']
+        ).values_list('email', flat=True)
+        return model.objects.filter(
+            sender_email__in=authorized_emails
+        ).order_by('-received_at')
+    else:
+        # Board members can only see their own emails
+        return model.objects.filter(
+            sender_email__iexact=user.email
+        ).order_by('-received_at')
+
+def filter_status(request, queryset):
+    """Apply an optional ?status= filter; ?status=PENDING is served by the partial index."""
+    email_status = request.query_params.get('status')
+    if email_status:
+        queryset = queryset.filter(status=email_status.upper())
+    return queryset
+
+def can_moderate(request, email):
+    """Admins and presidents can act on any email, board members only on their own."""
+    return (
+        has_capability(request, Capability.EMAILS_MODERATE_ANY)
+        or email.sender_email.lower() == request.user.email.lower()
+    )
 
 class IncomingEmailViewSet(viewsets.ModelViewSet):
     queryset = IncomingEmail.objects.all()
@@ -23,29 +59,17 @@ class IncomingEmailViewSet(viewsets.ModelViewSet):
     permission_classes = [CanManageEmails]
 
     def get_queryset(self):
-        user = self.request.user
-        
-        # Get all authorized email addresses
-        if user.role in ['ADMIN', 'PRESIDENT']:
-            # Admins and Presidents can see all emails
-            authorized_emails = User.objects.filter(
-                role__in=['ADMIN', 'PRESIDENT', 'BOARD']
-            ).values_list('email', flat=True)
-            return IncomingEmail.objects.filter(
-                sender_email__in=authorized_emails
-            ).order_by('-received_at')
-        else:
-            # Board members can only see their own emails
-            return IncomingEmail.objects.filter(
-                sender_email__iexact=user.email
-            ).order_by('-received_at')
+        queryset = visible_emails(self.request)
+        if self.action == 'list':
+            queryset = filter_status(self.request, queryset)
+        return queryset
 
     @action(detail=True, methods=['post'])
     def delete_email(self, request, pk=None):
         """Delete an email."""
         email = self.get_object()
         # Only allow users to delete their own emails or admins/presidents to delete any
-        if request.user.role not in ['ADMIN', 'PRESIDENT'] and email.sender_email.lower() != request.user.email.lower():
+        if not can_moderate(request, email):
             return Response(
                 {'error': 'You do not have permission to delete this email'},
                 status=status.HTTP_403_FORBIDDEN
@@ -53,48 +77,18 @@ class IncomingEmailViewSet(viewsets.ModelViewSet):
         email.delete()
         return Response({'status': 'success'})
 
-    @action(detail=False, methods=['post'])
-    def check_new(self, request):
-        """Manually trigger checking for new emails."""
-        try:
-            check_new_emails()
-            return Response({'status': 'success'})
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    @action(detail=True, methods=['get'])
+    def preview(self, request, pk=None):
+        """Size-bounded preview for the approval screen, cached per email version."""
+        # Only what the cache key needs; the body is loaded on a cache miss
+        email = get_object_or_404(self.get_queryset().only('id', 'updated_at'), pk=pk)
+        cached = get_preview(email)
+        return conditional_response(request, cached['content'], cached['etag'])
 
-    @action(detail=True, methods=['post'])
-    def approve(self, request, pk=None):
-        """Approve an email and send it to all subscribers."""
-        email = self.get_object()
-        
-        # Check if user has permission to approve this email
-        if request.user.role not in ['ADMIN', 'PRESIDENT'] and email.sender_email.lower() != request.user.email.lower():
-            return Response(
-                {'error': 'You do not have permission to approve this email'},
-                status=status.HTTP_403_FORBIDDEN
-            )
-            
-        if email.status != 'PENDING':
-            return Response(
-                {'error': 'Only pending emails can be approved'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        try:
-            send_approved_email(email.id)
-            email.status = 'APPROVED'
-            email.approved_by = request.user
-            email.approved_at = timezone.now()
-            email.save()
-            return Response({'status': 'success'})
-        except Exception as e:
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+    @action(detail=False, methods=['get'])
+    def sync_status(self, request):
+        """When the mailbox was last synced, how long it took, and whether a sync is running."""
+        return Response(mail_sync.status())
 
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
@@ -102,7 +96,7 @@ class IncomingEmailViewSet(viewsets.ModelViewSet):
         email = self.get_object()
         
         # Check if user has permission to reject this email
-        if request.user.role not in ['ADMIN', 'PRESIDENT'] and email.sender_email.lower() != request.user.email.lower():
+        if not can_moderate(request, email):
             return Response(
                 {'error': 'You do not have permission to reject this email'},
                 status=status.HTTP_403_FORBIDDEN
@@ -120,120 +114,136 @@ class IncomingEmailViewSet(viewsets.ModelViewSet):
         email.save()
         return Response({'status': 'success'})
 
-    @action(detail=False, methods=['get'], url_path='attachment/(?P<attachment_id>[^/.]+)', permission_classes=[])
-    def get_attachment(self, request, attachment_id=None):
-        """Serve an email attachment."""
-        try:
-            print(f"Attempting to serve attachment: {attachment_id}")
-            
-            # First find the email containing this attachment
-            email = IncomingEmail.objects.filter(
-                attachments__contains=[{'attachment_id': attachment_id}]
-            ).first()
-            
-            if not email:
-                print(f"No email found with attachment_id: {attachment_id}")
-                return Response(
-                    {'error': 'Attachment not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            
-            # Find the attachment metadata
-            attachment_meta = next(
-                (a for a in email.attachments if a['attachment_id'] == attachment_id),
-                None
+class ArchivedEmailViewSet(viewsets.ReadOnlyModelViewSet):
+    """Browse emails moved out of IncomingEmail by the archive_emails command."""
+    permission_classes = [CanManageEmails]
+
+    def get_queryset(self):
+        queryset = visible_emails(self.request, ArchivedEmail)
+        if self.action == 'list':
+            # Bodies stay compressed in the database until one email is opened
+            queryset = filter_status(self.request, queryset).defer('content', 'html_content')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ArchivedEmailListSerializer
+        return ArchivedEmailSerializer
+
+
+# Gmail-bound endpoints are native async views so waiting on Google doesn't
+# hold a worker. They are routed ahead of the viewset in api/urls.py.
+
+def find_moderated_email(request, pk):
+    """Return (email, can_moderate, user id) for a visible email, or (None, False, user id).
+
+    Sync so it can run in a thread: the user may be a lazily loaded ClaimsUser.
+    """
+    email = visible_emails(request).filter(pk=pk).first()
+    return email, email is not None and can_moderate(request, email), request.user.pk
+
+@async_api_view(['POST'], Capability.EMAILS_MANAGE)
+async def check_new(request):
+    """Manually trigger checking for new emails.
+
+    A trigger arriving while another sync runs waits for that run and shares its result.
+    """
+    try:
+        result = await mail_sync.acoordinate(gmail_async.check_new_emails)
+        return JsonResponse({
+            'status': 'success',
+            'stored': result.stored,
+            'shared': result.shared,
+            'duration_ms': result.duration_ms,
+        })
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@async_api_view(['POST'], Capability.EMAILS_MANAGE)
+async def approve(request, pk):
+    """Approve an email and send it to all subscribers."""
+    email, allowed, user_id = await sync_to_async(find_moderated_email)(request, pk)
+    if email is None:
+        return JsonResponse({'detail': 'No IncomingEmail matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Check if user has permission to approve this email
+    if not allowed:
+        return JsonResponse(
+            {'error': 'You do not have permission to approve this email'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if email.status != 'PENDING':
+        return JsonResponse(
+            {'error': 'Only pending emails can be approved'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Claim the email before sending, so a concurrent or retried approve can't send it twice
+    # update() skips auto_now, and updated_at keys the cached preview
+    approved_at = timezone.now()
+    claimed = await IncomingEmail.objects.filter(pk=email.pk, status='PENDING').aupdate(
+        status='APPROVED', approved_by_id=user_id, approved_at=approved_at, updated_at=approved_at
+    )
+    if not claimed:
+        return JsonResponse(
+            {'error': 'Only pending emails can be approved'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    email.status, email.approved_by_id, email.approved_at = 'APPROVED', user_id, approved_at
+    email.updated_at = approved_at
+
+    try:
+        await gmail_async.send_approved_email(email)
+        return JsonResponse({'status': 'success'})
+    except Exception as e:
+        if email.sent_at is None:
+            # Failed before delivering anything; let it be approved again
+            await IncomingEmail.objects.filter(pk=email.pk, status='APPROVED', sent_at__isnull=True).aupdate(
+                status='PENDING', approved_by_id=None, approved_at=None, updated_at=timezone.now()
             )
-            
-            if not attachment_meta:
-                print(f"No attachment metadata found for attachment_id: {attachment_id}")
-                return Response(
-                    {'error': 'Attachment metadata not found'},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-
-            print(f"Found attachment metadata: {attachment_meta}")
-
-            # Get the attachment data from Gmail
-            try:
-                service = get_gmail_service()
-                print("Gmail service initialized")
-                
-                # The attachment ID contains both message ID and attachment ID
-                # Format: message_id_attachment_id
-                try:
-                    # Get the original message ID
-                    original_message_id = email.original_email_id
-                    
-                    # Get the attachment ID - it's stored in the format message_id_attachment_id
-                    # We need to extract just the attachment ID part
-                    attachment_parts = attachment_meta['attachment_id'].split('_')
-                    # The attachment ID is everything after the message ID
-                    message_id_length = len(original_message_id) + 1  # +1 for the underscore
-                    attachment_id_only = attachment_meta['attachment_id'][message_id_length:]
-                    
-                    print(f"Using original message_id: {original_message_id}")
-                    print(f"Using attachment_id: {attachment_id_only}")
-                    
-                    attachment = service.users().messages().attachments().get(
-                        userId='me',
-                        messageId=original_message_id,
-                        id=attachment_id_only
-                    ).execute()
-                    
-                    if not attachment:
-                        print("No attachment data returned from Gmail API")
-                        return Response(
-                            {'error': 'Attachment not found in Gmail'},
-                            status=status.HTTP_404_NOT_FOUND
-                        )
-                    
-                    if 'data' not in attachment:
-                        print("No data field in attachment response")
-                        return Response(
-                            {'error': 'Attachment data not found'},
-                            status=status.HTTP_404_NOT_FOUND
-                        )
-
-                    print("Successfully retrieved attachment data from Gmail")
-
-                    # Decode the attachment data
-                    try:
-                        file_data = base64.urlsafe_b64decode(attachment['data'])
-                        print(f"Successfully decoded attachment data, size: {len(file_data)} bytes")
-                    except Exception as e:
-                        print(f"Error decoding attachment data: {str(e)}")
-                        return Response(
-                            {'error': 'Could not decode attachment data'},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                        )
-
-                    # Create the response with proper headers
-                    response = HttpResponse(
-                        file_data,
-                        content_type=attachment_meta['content_type']
-                    )
-                    response['Content-Disposition'] = f'attachment; filename="{attachment_meta["filename"]}"'
-                    response['Content-Length'] = len(file_data)
-                    print(f"Sending response with content type: {attachment_meta['content_type']}")
-                    return response
-                    
-                except Exception as e:
-                    print(f"Error processing attachment IDs: {str(e)}")
-                    return Response(
-                        {'error': 'Invalid attachment format'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-                
-            except Exception as e:
-                print(f"Error fetching attachment from Gmail: {str(e)}")
-                return Response(
-                    {'error': f'Could not fetch attachment from Gmail: {str(e)}'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
-        except Exception as e:
-            print(f"Error serving attachment: {str(e)}")
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            ) 
\ No newline at end of file
+        logger.exception("Error sending approved email %s", email.pk)
+        return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@async_api_view(['GET'])
+async def get_attachment(request, attachment_id):
+    """Serve an email attachment."""
+    # First find the email containing this attachment, then look in the archive
+    for model in (IncomingEmail, ArchivedEmail):
+        email = await model.objects.filter(
+            attachments__contains=[{'attachment_id': attachment_id}]
+        ).defer('content', 'html_content').afirst()
+        if email:
+            break
+    if not email:
+        logger.debug("No email found with attachment_id: %s", attachment_id)
+        return JsonResponse({'error': 'Attachment not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Find the attachment metadata
+    attachment_meta = next(
+        (a for a in email.attachments if a['attachment_id'] == attachment_id),
+        None
+    )
+    if not attachment_meta:
+        logger.debug("No attachment metadata found for attachment_id: %s", attachment_id)
+        return JsonResponse({'error': 'Attachment metadata not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Get the attachment data from Gmail
+    try:
+        async with gmail_async.gmail_client() as client:
+            file_data = await gmail_async.fetch_attachment_data(client, email, attachment_meta)
+    except Exception as e:
+        logger.exception("Error fetching attachment %s from Gmail", attachment_id)
+        return JsonResponse(
+            {'error': f'Could not fetch attachment from Gmail: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    if file_data is None:
+        logger.warning("No attachment data returned from Gmail API for %s", attachment_id)
+        return JsonResponse({'error': 'Attachment not found in Gmail'}, status=status.HTTP_404_NOT_FOUND)
+
+    response = HttpResponse(file_data, content_type=attachment_meta['content_type'])
+    response['Content-Disposition'] = f'attachment; filename="{attachment_meta["filename"]}"'
+    response['Content-Length'] = len(file_data)
+    return response
@@ -1,13 +1,39 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from datetime import datetime, time, timedelta
+from django.db.models import Count, DateField, Q
+from django.db.models.functions import TruncDate, TruncMonth
 from django.utils import timezone
-from django.db.models import Q
+from django.utils.dateparse import parse_date
+from django.http import HttpResponseBadRequest
+from django.views.decorators.http import require_GET
 from api.models import Event
 from api.serializers import EventSerializer
-from accounts.permissions import IsBoardOrHigher
+from accounts.permissions import Capability, has_capability
+from core.caching import conditional_response
+from ..services.event_feed import get_feed
 from ..permissions import IsAdminOrBoardMember
 
+# ?ordering= values, optionally prefixed with '-'
+EVENT_ORDERING_FIELDS = {
+    'start_date', 'end_date', 'ends_at', 'title', 'created_at',
+    'has_ended', 'is_full', 'spots_left', 'current_registrations',
+}
+
+# Calendar buckets and the longest window each may span
+CALENDAR_GROUPS = {
+    'day': (TruncDate, 93),
+    'month': (TruncMonth, 731),
+}
+# What a calendar cell needs, nothing more
+CALENDAR_FIELDS = ['id', 'title', 'start_date', 'end_date', 'venue', 'category', 'has_ended', 'is_full']
+
+def parse_bool(value):
+    if value is None:
+        return None
+    return value.lower() in ('1', 'true', 'yes')
+
 class EventViewSet(viewsets.ModelViewSet):
     serializer_class = EventSerializer
     queryset = Event.objects.all()
@@ -20,10 +46,11 @@ class EventViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
     def get_queryset(self):
-        queryset = Event.objects.all().order_by('-start_date')
+        # has_ended, is_full and spots_left come from SQL, against one `now`
+        queryset = Event.objects.with_status().order_by('-start_date')
         
         # If user is not admin/board member, only show active events
-        if not IsAdminOrBoardMember().has_permission(self.request, self):
+        if not has_capability(self.request, Capability.EVENTS_VIEW_INACTIVE):
             queryset = queryset.filter(is_active=True)
             
         # Filter by category
@@ -40,15 +67,21 @@ class EventViewSet(viewsets.ModelViewSet):
         # Only apply past/upcoming filter if explicitly requested
         show = self.request.query_params.get('show', None)
         if show == 'upcoming':
-            queryset = queryset.filter(
-                Q(end_date__gte=timezone.now()) | 
-                Q(end_date__isnull=True, start_date__gte=timezone.now())
-            )
+            queryset = queryset.filter(has_ended=False)
         elif show == 'past':
-            queryset = queryset.filter(
-                Q(end_date__lt=timezone.now()) | 
-                Q(end_date__isnull=True, start_date__lt=timezone.now())
-            )
+            queryset = queryset.filter(has_ended=True)
+
+        # Filter on the computed status
+        has_ended = parse_bool(self.request.query_params.get('has_ended'))
+        if has_ended is not None:
+            queryset = queryset.filter(has_ended=has_ended)
+        is_full = parse_bool(self.request.query_params.get('is_full'))
+        if is_full is not None:
+            queryset = queryset.filter(is_full=is_full)
+        min_spots = self.request.query_params.get('min_spots')
+        if min_spots and min_spots.isdigit():
+            # Events without a capacity always have room
+            queryset = queryset.filter(Q(spots_left__gte=int(min_spots)) | Q(capacity__isnull=True))
             
         # Search by title or description
         search = self.request.query_params.get('search', None)
@@ -57,9 +90,72 @@ class EventViewSet(viewsets.ModelViewSet):
                 Q(title__icontains=search) |
                 Q(description__icontains=search)
             )
+
+        ordering = self.request.query_params.get('ordering')
+        if ordering:
+            fields = [f for f in ordering.split(',') if f.lstrip('-') in EVENT_ORDERING_FIELDS]
+            if fields:
+                queryset = queryset.order_by(*fields, '-start_date')
             
         return queryset.select_related('created_by')
     
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Events between ?start= and ?end= (dates, end exclusive) bucketed by ?group=day|month.
+
+        Bucket counts are aggregated in SQL; the other list filters (category,
+        search, show, ...) apply as well.
+        """
+        group = request.query_params.get('group', 'month')
+        if group not in CALENDAR_GROUPS:
+            return Response(
+                {"error": "group must be 'day' or 'month'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        trunc, max_days = CALENDAR_GROUPS[group]
+
+        today = timezone.localdate()
+        start = request.query_params.get('start')
+        end = request.query_params.get('end')
+        try:
+            start = parse_date(start) if start else today.replace(day=1)
+            end = parse_date(end) if end else None
+        except ValueError:
+            start = end = None
+        if start is None or (request.query_params.get('end') and end is None):
+            return Response(
+                {"error": "start and end must be dates (YYYY-MM-DD)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end is None:
+            end = start + timedelta(days=31 if group == 'day' else 183)
+        if end <= start or (end - start).days > max_days:
+            return Response(
+                {"error": f"end must be after start and at most {max_days} days later for group={group}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        window_start = timezone.make_aware(datetime.combine(start, time.min))
+        window_end = timezone.make_aware(datetime.combine(end, time.min))
+        queryset = self.get_queryset().filter(
+            start_date__gte=window_start, start_date__lt=window_end
+        ).annotate(period=trunc('start_date', output_field=DateField()))
+
+        counts = queryset.order_by('period').values('period').annotate(count=Count('id'))
+        buckets = {row['period']: {'period': row['period'], 'count': row['count'], 'events': []} for row in counts}
+        for event in queryset.order_by('start_date', 'id').values('period', *CALENDAR_FIELDS):
+            bucket = buckets.get(event.pop('period'))
+            if bucket is not None:
+                bucket['events'].append(event)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'group': group,
+            'total': sum(bucket['count'] for bucket in buckets.values()),
+            'buckets': list(buckets.values()),
+        })
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
@@ -80,7 +176,7 @@ class EventViewSet(viewsets.ModelViewSet):
             )
             
         event.current_registrations += 1
-        event.save()
+        event.save(update_fields=['current_registrations', 'updated_at'])
         
         return Response({
             "message": "Successfully registered for the event",
@@ -99,7 +195,7 @@ class EventViewSet(viewsets.ModelViewSet):
             
         if event.current_registrations > 0:
             event.current_registrations -= 1
-            event.save()
+            event.save(update_fields=['current_registrations', 'updated_at'])
             
         return Response({
             "message": "Successfully unregistered from the event",
@@ -129,3 +225,19 @@ class EventViewSet(viewsets.ModelViewSet):
             "status": f"Event {'activated' if event.is_active else 'deactivated'} successfully",
             "is_active": event.is_active
         })
+
+FEED_CACHE_CONTROL = 'public, max-age=300'
+
+@require_GET
+def event_feed(request):
+    """iCalendar (.ics) feed of the active events, optionally for one ?category=."""
+    category = request.GET.get('category', '').upper() or None
+    if category and category not in dict(Event.EVENT_CATEGORIES):
+        return HttpResponseBadRequest('Unknown category')
+    feed = get_feed(category)
+    return conditional_response(
+        request, feed['content'], feed['etag'],
+        content_type='text/calendar; charset=utf-8',
+        last_modified=feed['last_modified'],
+        cache_control=FEED_CACHE_CONTROL,
+    )
@@ -1,8 +1,11 @@
 from rest_framework import viewsets, permissions
 from api.models import TeamMember
 from api.serializers import TeamMemberSerializer
+from accounts.signals import TEAM_CACHE_NAMESPACE
+from core.caching import CachedListMixin
 
-class TeamMemberViewSet(viewsets.ModelViewSet):
+class TeamMemberViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    cache_namespace = TEAM_CACHE_NAMESPACE  # Invalidated by User/TeamMember saves
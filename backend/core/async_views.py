@@ -0,0 +1,59 @@
+"""
+Helpers for native async Django views that sit next to the DRF API.
+
+DRF views are synchronous, so async endpoints authenticate with the configured
+DRF authentication classes themselves, in a worker thread, and answer with the
+same JSON error shapes DRF would.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+from accounts.permissions import has_capability
+
+
+def _authenticate(request):
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authenticator_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+async def authenticate(request):
+    """Set request.user from the DRF authentication classes; raises APIException on bad credentials."""
+    request.user = await sync_to_async(_authenticate)(request)
+    return request.user
+
+
+def async_api_view(methods, capability=None):
+    """Wrap an async view: allowed methods, no CSRF (token auth), and a capability check.
+
+    With capability=None the view is public and no authentication is attempted.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if capability is not None:
+                try:
+                    user = await authenticate(request)
+                except APIException as exc:
+                    data = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+                    return JsonResponse(data, status=exc.status_code)
+                if user is None:
+                    return JsonResponse(
+                        {'detail': 'Authentication credentials were not provided.'}, status=401
+                    )
+                if not has_capability(request, capability):
+                    return JsonResponse(
+                        {'detail': 'You do not have permission to perform this action.'}, status=403
+                    )
+            return await view(request, *args, **kwargs)
+
+        return csrf_exempt(require_http_methods(methods)(wrapper))
+    return decorator
@@ -0,0 +1,118 @@
+"""
+Small helpers for caching rendered API responses.
+
+Cached entries are namespaced by a generation number. Bumping the generation
+(usually from a model signal) invalidates every entry of the namespace at once
+without having to know their keys.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+from .renderers import FastJSONRenderer
+
+
+# Backends whose entries only the writing process sees (or nobody sees)
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def cache_is_shared(alias='default'):
+    """Whether writes to the cache are seen by every worker process."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+def _generation_key(namespace):
+    return f'cache-generation:{namespace}'
+
+
+def get_generation(namespace):
+    generation = cache.get(_generation_key(namespace))
+    if generation is None:
+        cache.add(_generation_key(namespace), 1, None)
+        generation = cache.get(_generation_key(namespace), 1)
+    return generation
+
+
+def bump_generation(namespace):
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        # The key was evicted or never set; any fresh value invalidates old entries
+        cache.set(_generation_key(namespace), 2, None)
+
+
+def make_etag(content):
+    return '"%s"' % hashlib.md5(content, usedforsecurity=False).hexdigest()
+
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match header matches the given strong ETag."""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return etag.removeprefix('W/') in candidates
+
+
+def not_modified_since(request, last_modified):
+    """Whether If-Modified-Since is at or after last_modified (a datetime)."""
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def conditional_response(request, content, etag, content_type='application/json',
+                         last_modified=None, cache_control='no-cache'):
+    """Return a 304 when the client already has this content, the content otherwise.
+
+    If-None-Match takes precedence; If-Modified-Since is only checked without it.
+    """
+    if 'HTTP_IF_NONE_MATCH' in request.META:
+        fresh = etag_matches(request, etag)
+    else:
+        fresh = last_modified is not None and not_modified_since(request, last_modified)
+    if fresh:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = cache_control
+    return response
+
+
+class CachedListMixin:
+    """Serve `list` from a pre-rendered JSON cache with ETag/304 support.
+
+    Set `cache_namespace` and bump it (see bump_generation) whenever the
+    underlying data changes. The full URL is part of the key so pagination,
+    query parameters and absolute media URLs are cached separately.
+
+    A bump only reaches the process that made it when the cache is per process,
+    so entries then expire after `local_cache_timeout` instead.
+    """
+    cache_namespace = None
+    cache_timeout = 60 * 60
+    local_cache_timeout = 30
+
+    def list(self, request, *args, **kwargs):
+        generation = get_generation(self.cache_namespace)
+        key = f'{self.cache_namespace}:{generation}:{request.build_absolute_uri()}'
+        cached = cache.get(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            content = FastJSONRenderer().render(response.data)
+            cached = {'content': content, 'etag': make_etag(content)}
+            timeout = self.cache_timeout
+            if not cache_is_shared():
+                timeout = min(timeout, self.local_cache_timeout)
+            cache.set(key, cached, timeout)
+        return conditional_response(request, cached['content'], cached['etag'])
@@ -0,0 +1,71 @@
+"""
+Database connection metrics: connection churn, and psycopg pool saturation.
+
+Every connection Django opens is counted in db_connections_opened_total, so
+with persistent connections it should grow far slower than requests. With a
+pool, Django "opens" one per checkout; db_pool_connections_opened counts the
+real ones. When an alias uses Django's psycopg connection pool (OPTIONS['pool']), the
+pool's own statistics are sampled into db_pool_* gauges at each scrape; the
+request, wait and connection figures are cumulative for this process.
+"""
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .metrics import counter, gauge, registry
+
+connections_opened = counter('db_connections_opened_total', 'Database connections opened, by alias')
+
+# psycopg_pool get_stats() key -> (gauge name, help, scale)
+POOL_STATS = {
+    'pool_max': ('db_pool_max_size', 'Largest size the pool may grow to', 1),
+    'pool_size': ('db_pool_size', 'Connections currently held by the pool', 1),
+    'pool_available': ('db_pool_available', 'Idle connections ready to hand out', 1),
+    'requests_waiting': ('db_pool_requests_waiting', 'Requests waiting for a connection right now', 1),
+    'requests_num': ('db_pool_requests', 'Connections requested from the pool (cumulative)', 1),
+    'requests_queued': ('db_pool_requests_queued', 'Requests that had to wait (cumulative)', 1),
+    'requests_wait_ms': ('db_pool_wait_seconds', 'Time spent waiting for a connection (cumulative)', 0.001),
+    'requests_errors': ('db_pool_timeouts', 'Requests that timed out waiting (cumulative)', 1),
+    'connections_num': ('db_pool_connections_opened', 'Connections opened by the pool (cumulative)', 1),
+    'connections_ms': ('db_pool_connect_seconds', 'Time spent opening connections (cumulative)', 0.001),
+    'connections_lost': ('db_pool_connections_lost', 'Connections found broken (cumulative)', 1),
+}
+
+_installed = False
+
+
+def count_connection(sender, connection, **kwargs):
+    connections_opened.inc(alias=connection.alias)
+
+
+def pool_of(alias):
+    """The psycopg pool of an alias if one was opened in this process, else None."""
+    wrapper = connections[alias]
+    if not wrapper.settings_dict.get('OPTIONS', {}).get('pool'):
+        return None
+    # Don't open a pool just to report on it
+    return getattr(type(wrapper), '_connection_pools', {}).get(alias)
+
+
+def collect_pool_stats():
+    for alias in connections:
+        pool = pool_of(alias)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        for key, (name, help_text, scale) in POOL_STATS.items():
+            gauge(name, help_text).set(stats.get(key, 0) * scale, alias=alias)
+        if stats.get('pool_max'):
+            in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+            gauge('db_pool_saturation', 'Share of the pool maximum in use').set(
+                round(in_use / stats['pool_max'], 4), alias=alias
+            )
+
+
+def install():
+    """Start recording connection metrics; safe to call more than once."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    connection_created.connect(count_connection, dispatch_uid='core.db_metrics')
+    registry.add_collector(collect_pool_stats)
@@ -0,0 +1,85 @@
+"""
+Sends reads of safe requests to read replicas, everything else to the primary.
+
+ReplicaRoutingMiddleware decides per request whether its reads may go to a
+replica (see core.middleware); ReplicaRouter then picks one of the
+DATABASE_REPLICAS aliases for each read. Writes, reads inside a transaction,
+and reads outside a routed request always use the primary. A replica that
+can't be reached is skipped for REPLICA_RETRY_SECONDS, falling back to the
+primary when none is left.
+"""
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+REPLICA_RETRY_SECONDS = 30
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+_unavailable = {}  # alias -> monotonic time until which it is skipped
+
+replica_fallbacks = counter('db_replica_fallbacks_total', 'Replicas marked unavailable, by alias')
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+@contextmanager
+def use_replicas(enabled=True):
+    """Let reads in this block (and the threads it hands work to) go to a replica."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def available(alias):
+    until = _unavailable.get(alias)
+    if until is not None:
+        if time.monotonic() < until:
+            return False
+        # Another request thread may have cleared it already
+        _unavailable.pop(alias, None)
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        logger.warning('Replica %s unavailable, reading from the primary', alias, exc_info=True)
+        _unavailable[alias] = time.monotonic() + REPLICA_RETRY_SECONDS
+        replica_fallbacks.inc(alias=alias)
+        return False
+    return True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _use_replica.get():
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction on the primary must see its writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        replicas = replica_aliases()
+        random.shuffle(replicas)
+        for alias in replicas:
+            if available(alias):
+                return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
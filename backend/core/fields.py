@@ -0,0 +1,118 @@
+"""
+Model fields shared by the apps.
+"""
+import zlib
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+# One byte tag in front of every stored value
+RAW = b'r'
+ZLIB = b'z'
+# Below this many bytes compressing doesn't pay for the zlib header
+MIN_COMPRESS_SIZE = 256
+
+
+class CompressedValue:
+    """A stored, still compressed value as read from the database.
+
+    Model instances decompress it on first attribute access. values() and
+    values_list() hand it out as is; call str() on it to get the text.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = bytes(data)
+
+    def decompress(self):
+        tag, body = self.data[:1], self.data[1:]
+        if tag == ZLIB:
+            body = zlib.decompress(body)
+        return body.decode('utf-8')
+
+    def __str__(self):
+        return self.decompress()
+
+    def __repr__(self):
+        return f'<CompressedValue {len(self.data)} bytes>'
+
+
+def compress_text(text, level=6):
+    data = text.encode('utf-8')
+    if len(data) >= MIN_COMPRESS_SIZE:
+        compressed = zlib.compress(data, level)
+        if len(compressed) < len(data):
+            return ZLIB + compressed
+    return RAW + data
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Decompresses on first read. Defining __set__ makes this a data
+    descriptor, so reads go through __get__ even once the value is loaded."""
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedValue):
+            value = value.decompress()
+            instance.__dict__[self.field.attname] = value
+        return value
+
+
+class CompressedTextField(models.BinaryField):
+    """Text stored zlib-compressed in a binary column.
+
+    Rows are decompressed lazily, the first time the attribute is read, so
+    listing emails without touching their bodies costs no CPU. A value that
+    was loaded but never read is saved back as the same bytes, without being
+    compressed again. The column can't be searched with text lookups.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, compression_level=6, **kwargs):
+        self.compression_level = compression_level
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compression_level != 6:
+            kwargs['compression_level'] = self.compression_level
+        if kwargs.get('editable') is True:
+            del kwargs['editable']
+        return name, path, args, kwargs
+
+    def get_default(self):
+        default = super().get_default()
+        return '' if default == b'' else default
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return CompressedValue(value)
+
+    def to_python(self, value):
+        if isinstance(value, CompressedValue):
+            return value.decompress()
+        if isinstance(value, (bytes, memoryview)):
+            return CompressedValue(value).decompress()
+        return value
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        if isinstance(value, CompressedValue):
+            return value.data
+        return compress_text(str(value), self.compression_level)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        return connection.Database.Binary(value)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
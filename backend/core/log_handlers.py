@@ -0,0 +1,113 @@
+"""
+Logging handlers used by the LOGGING setting.
+
+AsyncStreamHandler hands records to a background thread so request threads never
+block on console I/O, and SamplingFilter keeps only a fraction of DEBUG records
+when per-recipient tracing is switched on in production.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+
+from .metrics import counter
+
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Render each record as a single JSON line including any `extra` fields."""
+
+    def format(self, record):
+        payload = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass records at or above `min_level` and a `rate` fraction of the rest."""
+
+    def __init__(self, rate=1.0, min_level='INFO'):
+        super().__init__()
+        self.rate = float(rate)
+        self.min_level = logging.getLevelName(min_level) if isinstance(min_level, str) else min_level
+
+    def filter(self, record):
+        if record.levelno >= self.min_level or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class AsyncStreamHandler(logging.Handler):
+    """Queue records in memory and write them to a stream from a worker thread.
+
+    The queue is bounded; when it is full new records are dropped and counted in
+    `log_records_dropped_total` instead of blocking the caller.
+    """
+
+    _STOP = object()
+
+    def __init__(self, stream=None, max_queue=10000):
+        super().__init__()
+        self.stream = stream or sys.stderr
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._pid = None
+        self._dropped = counter('log_records_dropped_total', 'Log records dropped because the queue was full')
+
+    def _ensure_worker(self):
+        # Start lazily, and again after a fork since threads don't survive it
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._drain, name='async-log-writer', daemon=True)
+            self._thread.start()
+
+    def emit(self, record):
+        try:
+            # Resolve the message now, the arguments may change once we return
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self._ensure_worker()
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._dropped.inc()
+        except Exception:
+            self.handleError(record)
+
+    def _drain(self):
+        while True:
+            record = self.queue.get()
+            if record is self._STOP:
+                break
+            try:
+                self.stream.write(self.format(record) + '\n')
+                if self.queue.empty():
+                    self.stream.flush()
+            except Exception:
+                self.handleError(record)
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            try:
+                self.queue.put(self._STOP, timeout=1)
+                self._thread.join(timeout=2)
+            except queue.Full:
+                pass
+        super().close()
@@ -0,0 +1,206 @@
+"""
+In-process metrics shared by the apps: counters, gauges, histograms and timing spans.
+
+Everything is kept in memory per process and guarded by a lock, so recording a
+value costs a dict lookup and an addition.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, lock):
+        self.name = name
+        self.help_text = help_text
+        self._lock = lock
+        self._values = {}
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, lock, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, lock)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help_text, threading.Lock(), **kwargs)
+        return metric
+
+    def counter(self, name, help_text=''):
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name, help_text=''):
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name, help_text='', buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def add_collector(self, collector):
+        """Call collector() before each collect(), to refresh gauges sampled from elsewhere."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def collect(self):
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception('Metrics collector %r failed', collector)
+        with self._lock:
+            return sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+            self._collectors.clear()
+
+
+registry = MetricsRegistry()
+
+
+def counter(name, help_text=''):
+    return registry.counter(name, help_text)
+
+
+def gauge(name, help_text=''):
+    return registry.gauge(name, help_text)
+
+
+def histogram(name, help_text='', buckets=DEFAULT_BUCKETS):
+    return registry.histogram(name, help_text, buckets)
+
+
+@contextmanager
+def span(name, **labels):
+    """Time a block into the `<name>_seconds` histogram.
+
+    Exceptions are counted in `<name>_errors_total` and re-raised.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        registry.counter(f'{name}_errors_total').inc(**labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        registry.histogram(f'{name}_seconds').observe(elapsed, **labels)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('span %s took %.2fms', name, elapsed * 1000, extra={'span': name, **labels})
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    rendered = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return '{' + rendered + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(metrics_registry=None):
+    """Render every metric in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for metric in (metrics_registry or registry).collect():
+        if metric.help_text:
+            lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        samples = metric.samples()
+        if metric.kind == 'histogram':
+            for key, (counts, total, count) in sorted(samples.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric.name}_bucket{_format_labels(key, [("le", _format_value(float(bound)))])} {cumulative}')
+                lines.append(f'{metric.name}_bucket{_format_labels(key, [("le", "+Inf")])} {count}')
+                lines.append(f'{metric.name}_sum{_format_labels(key)} {_format_value(total)}')
+                lines.append(f'{metric.name}_count{_format_labels(key)} {count}')
+        else:
+            for key, value in sorted(samples.items()):
+                lines.append(f'{metric.name}{_format_labels(key)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,338 @@
+import logging
+import re
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import parse_http_date_safe
+from django.utils.text import compress_string
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import db_metrics
+from .caching import cache_is_shared, make_etag
+from .db_routers import replica_aliases, use_replicas
+from .metrics import counter, histogram
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger('core.slow_requests')
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times queries, optionally keeping the SQL."""
+
+    def __init__(self, capture_sql=False):
+        self.capture_sql = capture_sql
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.capture_sql:
+                self.queries.append({
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'ms': round(elapsed * 1000, 3),
+                })
+
+
+def resolve_view_label(view_func, method):
+    """Return (view, action) labels for a resolved view function.
+
+    DRF viewsets expose the method -> action mapping on the view function, plain
+    APIViews and Django class-based views expose the class.
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is not None:
+        name = view_class.__name__
+    else:
+        name = getattr(view_func, '__name__', view_func.__class__.__name__)
+    actions = getattr(view_func, 'actions', None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return name, action
+
+
+class PerformanceMiddleware:
+    """Record wall time, DB query count/time and response size per view and action.
+
+    The numbers go into the in-process histograms served by /metrics/. When
+    SLOW_REQUEST_THRESHOLD_MS is set, the SQL of each request is captured and
+    requests slower than the threshold are logged with their queries.
+
+    Works in both sync and async chains, so async views stay async under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', None)
+        self.durations = histogram('http_request_duration_seconds', 'Request wall time by view and action')
+        self.query_counts = histogram('http_request_db_queries', 'DB queries per request', QUERY_COUNT_BUCKETS)
+        self.query_durations = histogram('http_request_db_seconds', 'Time spent in DB queries per request')
+        self.response_sizes = histogram('http_response_size_bytes', 'Response body size', RESPONSE_SIZE_BUCKETS)
+        db_metrics.install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder(capture_sql=self.slow_threshold is not None)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self.hook_connections(stack, recorder)
+            response = self.get_response(request)
+        return self.record(request, response, recorder, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder(capture_sql=self.slow_threshold is not None)
+        start = time.perf_counter()
+        stack = ExitStack()
+        # Connections are per thread and async requests run their queries in the
+        # request's thread-sensitive worker, so hook the connections there.
+        await sync_to_async(self.hook_connections)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, recorder, time.perf_counter() - start)
+
+    @staticmethod
+    def hook_connections(stack, recorder):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+    def record(self, request, response, recorder, elapsed):
+        view, action = getattr(request, '_perf_view', ('unresolved', request.method.lower()))
+        labels = {'view': view, 'action': action}
+        self.durations.observe(elapsed, method=request.method, status=response.status_code, **labels)
+        self.query_counts.observe(recorder.count, **labels)
+        self.query_durations.observe(recorder.duration, **labels)
+        if not response.streaming:
+            self.response_sizes.observe(len(response.content), **labels)
+
+        if self.slow_threshold is not None and elapsed * 1000 >= self.slow_threshold:
+            slow_request_logger.warning(
+                'Slow request %s %s took %.1fms with %d queries',
+                request.method, request.path, elapsed * 1000, recorder.count,
+                extra={
+                    'view': view,
+                    'action': action,
+                    'duration_ms': round(elapsed * 1000, 3),
+                    'db_ms': round(recorder.duration * 1000, 3),
+                    'queries': recorder.queries[:100],
+                },
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._perf_view = resolve_view_label(view_func, request.method)
+        return None
+
+
+COMPRESSIBLE_TYPES_RE = re.compile(r'^(text/|application/(json|javascript|xml|[\w.+-]+\+(json|xml))\b)')
+ACCEPT_ENCODING_RE = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*')
+BROTLI_QUALITY = 4  # Fast enough for per-request compression, still ahead of gzip
+
+
+def accepted_encodings(header):
+    """The content codings the client accepts (q > 0), lowercased."""
+    accepted = set()
+    for item in header.split(','):
+        match = ACCEPT_ENCODING_RE.fullmatch(item)
+        if match and (match.group(2) is None or float(match.group(2) or 0) > 0):
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+class APICompressionMiddleware:
+    """Weak ETags with 304s, and gzip/brotli compression, for API GET responses.
+
+    Applies to paths under API_COMPRESS_PATHS only, so authentication responses
+    carrying tokens are never compressed (BREACH). The ETag is computed on the
+    uncompressed body, so it is the same whichever coding the client accepts.
+    Streaming responses, attachments and EXCLUDED_URL_NAMES are left alone.
+    Brotli is used when the brotli package is installed and the client accepts it.
+    """
+    sync_capable = True
+    async_capable = True
+
+    EXCLUDED_URL_NAMES = {'email-get-attachment'}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, 'API_COMPRESS_PATHS', ('/api/',)))
+        self.min_size = getattr(settings, 'API_COMPRESS_MIN_BYTES', 1024)
+        self.compressed = counter('http_responses_compressed_total', 'Responses compressed, by coding')
+        self.not_modified = counter('http_responses_not_modified_total', 'GET responses answered with a 304 from their ETag')
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def applies(self, request, response):
+        if response.streaming or not request.path.startswith(self.paths):
+            return False
+        if response.get('Content-Disposition', '').lower().startswith('attachment'):
+            return False
+        match = getattr(request, 'resolver_match', None)
+        return not (match and match.url_name in self.EXCLUDED_URL_NAMES)
+
+    def process_response(self, request, response):
+        if not self.applies(request, response):
+            return response
+
+        if request.method in ('GET', 'HEAD') and response.status_code == 200:
+            if not response.has_header('ETag'):
+                response['ETag'] = 'W/' + make_etag(response.content)
+            conditional = get_conditional_response(
+                request,
+                etag=response['ETag'],
+                last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+                response=response,
+            )
+            if conditional is not response:
+                self.not_modified.inc()
+                return conditional
+
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if len(response.content) < self.min_size or response.has_header('Content-Encoding'):
+            return response
+        if not COMPRESSIBLE_TYPES_RE.match(response.get('Content-Type', '')):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            encoding, content = 'br', brotli.compress(response.content, quality=BROTLI_QUALITY)
+        elif 'gzip' in accepted or '*' in accepted:
+            # Random bytes in the gzip header, as Django's GZipMiddleware does
+            encoding, content = 'gzip', compress_string(response.content, max_random_bytes=100)
+        else:
+            return response
+        if len(content) >= len(response.content):
+            return response
+
+        # The ETag now describes the uncompressed representation only
+        etag = response.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        self.compressed.inc(encoding=encoding)
+        return response
+
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def jwt_user_id(request):
+    """The user id of a valid bearer access token, without touching the database."""
+    parts = request.META.get(jwt_settings.AUTH_HEADER_NAME, '').split()
+    if len(parts) != 2 or parts[0] not in jwt_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return AccessToken(parts[1]).get(jwt_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+class ReplicaRoutingMiddleware:
+    """Let the reads of safe requests go to DATABASE_REPLICAS (see core.db_routers).
+
+    A JWT user who just made a successful write is pinned to the primary for
+    REPLICA_PIN_SECONDS, so they read their own writes while the replicas
+    catch up. Requests with a session cookie (the admin) always use the
+    primary. Without replicas configured this does nothing.
+
+    Pins live in the cache, so outside DEBUG the cache must be shared by every
+    worker; otherwise the next request may land on a worker that never saw the pin.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        if self.enabled and not settings.DEBUG and not cache_is_shared():
+            raise ImproperlyConfigured(
+                'DATABASE_REPLICAS needs a cache shared by all workers (Redis or Memcached) '
+                'to pin writers to the primary; set CACHE_BACKEND/CACHE_LOCATION.'
+            )
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        self.routed = counter('db_read_routing_requests_total', 'Requests by where their reads were routed')
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        user_id, replica = self.route(request)
+        with use_replicas(replica):
+            response = self.get_response(request)
+        return self.after_response(request, response, user_id)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        user_id, replica = self.route(request)
+        # The context var reaches the sync_to_async threads the view runs queries in
+        with use_replicas(replica):
+            response = await self.get_response(request)
+        return self.after_response(request, response, user_id)
+
+    def route(self, request):
+        """Return (jwt user id, whether reads may go to a replica)."""
+        user_id = jwt_user_id(request)
+        if request.method not in SAFE_METHODS:
+            reason = 'write'
+        elif settings.SESSION_COOKIE_NAME in request.COOKIES:
+            reason = 'session'
+        elif user_id is not None and cache.get(_pin_key(user_id)):
+            reason = 'pinned'
+        else:
+            reason = 'replica'
+        self.routed.inc(target=reason)
+        return user_id, reason == 'replica'
+
+    def after_response(self, request, response, user_id):
+        if request.method not in SAFE_METHODS and user_id is not None and response.status_code < 400:
+            cache.set(_pin_key(user_id), True, self.pin_seconds)
+        return response
@@ -0,0 +1,107 @@
+"""
+orjson-backed JSON renderer and parser for DRF, with the stdlib as fallback.
+
+Output matches rest_framework's JSONRenderer with the default settings:
+compact separators, UTF-8 instead of \\u escapes, U+2028/U+2029 escaped, and
+datetimes, decimals, UUIDs etc. converted by DRF's own JSONEncoder. Whenever a
+request needs something orjson can't do the same way (indent other than none,
+ASCII-only or non-compact output, integers beyond 64 bits), rendering falls back
+to the stdlib so the bytes stay identical.
+
+Floats are the exception, since checking for them costs more than the render:
+orjson writes exponents without '+' or zero padding (1e16, 1.5e-7) and some small
+values in fixed notation (0.00001), which parse to the same float, and it
+writes NaN and infinity as null where DRF raises ValueError. Our models' only
+float fields are the mail sync durations.
+
+Request bodies orjson rejects, or that parse to a float beyond the 64-bit range
+with no fractional part (orjson's result for integers it can't hold), are
+parsed again by the stdlib, which also gives DRF's error messages. Without
+orjson installed both classes behave exactly like DRF's.
+"""
+import io
+import re
+from itertools import chain
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.parsers import JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_encoder = JSONEncoder()
+# U+2028/U+2029 in UTF-8; one regex pass is cheaper than two bytes.replace()
+LINE_SEPARATORS_RE = re.compile(b'\xe2\x80[\xa8\xa9]')
+LINE_SEPARATOR_ESCAPES = {b'\xe2\x80\xa8': b'\\u2028', b'\xe2\x80\xa9': b'\\u2029'}
+# Beyond the 64-bit range orjson parses integers into floats
+INT64_LIMIT = 2.0 ** 63
+
+if orjson is not None:
+    # Datetimes go through DRF's encoder, for its 'Z' suffix on UTC times
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safety escaping as DRF
+        if LINE_SEPARATORS_RE.search(ret):
+            ret = LINE_SEPARATORS_RE.sub(lambda m: LINE_SEPARATOR_ESCAPES[m.group()], ret)
+        return ret
+
+
+def _lost_integer(value):
+    return type(value) is float and not -INT64_LIMIT <= value < INT64_LIMIT and value.is_integer()
+
+
+def may_have_lost_integers(data):
+    """Whether orjson's result has a float that may have been a longer integer.
+
+    Goes one nesting level at a time so the value types of every container on
+    a level are collected in C; Python only loops over levels holding floats or
+    containers. A genuine float like 1e20 also matches, which only costs a
+    stdlib parse.
+    """
+    dicts = [data] if type(data) is dict else []
+    lists = [data] if type(data) is list else []
+    if not dicts and not lists:
+        return _lost_integer(data)
+    while dicts or lists:
+        values = list(chain(chain.from_iterable(map(dict.values, dicts)), chain.from_iterable(lists)))
+        kinds = set(map(type, values))
+        if float in kinds and any(map(_lost_integer, values)):
+            return True
+        dicts = [value for value in values if type(value) is dict] if dict in kinds else []
+        lists = [value for value in values if type(value) is list] if list in kinds else []
+    return False
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8' or not api_settings.STRICT_JSON:
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            if not may_have_lost_integers(data):
+                return data
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -49,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',  # Outermost so it times the whole stack
+    'core.middleware.APICompressionMiddleware',  # ETag/304 and gzip/brotli for /api/
+    'core.middleware.ReplicaRoutingMiddleware',  # Reads of safe requests may use DATABASE_REPLICAS
     'corsheaders.middleware.CorsMiddleware',  # Must be before CommonMiddleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -91,9 +94,28 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': 'localhost',
         'PORT': '5432',
+        # 0 opens a connection per request; core.settings_production keeps them open or pools them
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '') == '1',
     }
 }
 
+# Read replicas
+# DB_REPLICA_HOSTS (comma separated) adds an alias per host, replica1, replica2, ...,
+# with the primary's other settings. Reads of GET/HEAD/OPTIONS requests go to them
+# (see core.db_routers); a user who just wrote reads from the primary for
+# REPLICA_PIN_SECONDS. The pin is kept in the cache, which outside DEBUG must be
+# shared by all workers. core.settings_replica_local tries this with two SQLite files.
+for _index, _host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -166,13 +188,30 @@ CORS_ALLOW_HEADERS = [
 ]
 
 # REST Framework settings
+# JWT_CLAIMS_AUTH=1 authenticates from the role/active claims in the access token
+# instead of loading the user row on every request (see accounts.authentication).
+# Outside DEBUG it requires a shared cache, which carries role changes and
+# deactivations to every worker.
+JWT_CLAIMS_AUTH = os.environ.get('JWT_CLAIMS_AUTH', '0') == '1'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication' if JWT_CLAIMS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson when installed, same bytes as DRF's JSONRenderer (see core.renderers)
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
@@ -186,8 +225,85 @@ SIMPLE_JWT = {
     'UPDATE_LAST_LOGIN': True,
     'ALGORITHM': 'HS256',
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.RoleTokenObtainPairSerializer',
+    # Rotated refresh tokens are revoked in accounts.RevokedToken instead of the
+    # token_blacklist app; run purge_revoked_tokens periodically to prune it.
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RotatingTokenRefreshSerializer',
 }
 
+# How long ClaimsJWTAuthentication keeps a loaded user row, in seconds
+AUTH_USER_CACHE_TIMEOUT = 30
+
 # Media files (Uploaded files)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Profile picture variants are rendered on a background thread after the upload
+# commits; set to False to render them inline (e.g. in management scripts).
+PROFILE_PICTURE_VARIANTS_ASYNC = True
+
+# Largest accepted profile picture, checked while the upload streams in
+PROFILE_PICTURE_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+# Cache
+# Local memory is per process; point CACHE_BACKEND/CACHE_LOCATION at Redis or
+# Memcached in production so invalidations reach every worker (the production
+# profile defaults to Redis). With a per-process cache, cached lists expire
+# after CachedListMixin.local_cache_timeout seconds.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'asiancrossroads'),
+    }
+}
+
+# Request metrics
+# Served in Prometheus format at /metrics/ to admins or to scrapers presenting
+# METRICS_TOKEN as a bearer token. Set SLOW_REQUEST_THRESHOLD_MS to log the SQL
+# of requests slower than the threshold.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+SLOW_REQUEST_THRESHOLD_MS = (
+    float(os.environ['SLOW_REQUEST_THRESHOLD_MS']) if os.environ.get('SLOW_REQUEST_THRESHOLD_MS') else None
+)
+
+# Emails sent or rejected more than this many days ago are moved to the archive
+# table by the archive_emails command.
+EMAIL_ARCHIVE_AFTER_DAYS = int(os.environ.get('EMAIL_ARCHIVE_AFTER_DAYS', 90))
+
+# API response compression (core.middleware.APICompressionMiddleware). Bodies
+# smaller than API_COMPRESS_MIN_BYTES are sent as is; install brotli to offer br.
+API_COMPRESS_PATHS = ('/api/',)
+API_COMPRESS_MIN_BYTES = int(os.environ.get('API_COMPRESS_MIN_BYTES', 1024))
+
+# Logging
+# Records are written by a background thread. DEBUG tracing (per recipient and
+# per attachment) can be sampled with LOG_DEBUG_SAMPLE_RATE when enabled in production.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'structured': {
+            '()': 'core.log_handlers.StructuredFormatter',
+        },
+    },
+    'filters': {
+        'sample_debug': {
+            '()': 'core.log_handlers.SamplingFilter',
+            'rate': os.environ.get('LOG_DEBUG_SAMPLE_RATE', '1.0'),
+        },
+    },
+    'handlers': {
+        'async_console': {
+            'class': 'core.log_handlers.AsyncStreamHandler',
+            'formatter': 'structured',
+            'filters': ['sample_debug'],
+        },
+    },
+    'loggers': {
+        'api': {'handlers': ['async_console'], 'level': LOG_LEVEL, 'propagate': False},
+        'accounts': {'handlers': ['async_console'], 'level': LOG_LEVEL, 'propagate': False},
+        'core': {'handlers': ['async_console'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
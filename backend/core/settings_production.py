@@ -0,0 +1,47 @@
+"""
+Production profile: reused database connections, DEBUG off.
+
+    DJANGO_SETTINGS_MODULE=core.settings_production
+
+By default each worker thread keeps its connection for DB_CONN_MAX_AGE seconds
+(60) and checks it is still alive before reusing it after a request. With
+DB_POOL=1 the workers share a psycopg connection pool per alias instead
+(needs psycopg[pool]; DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT).
+Connection churn and pool saturation are served at /metrics/ (see core.db_metrics).
+
+The cache is shared between workers, so invalidations reach all of them: Redis
+at REDIS_URL by default, or any CACHE_BACKEND/CACHE_LOCATION.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DEBUG = False
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
+SECRET_KEY = os.environ.get('SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1')),
+    }
+}
+
+DB_POOL = os.environ.get('DB_POOL', '') == '1'
+
+for database in DATABASES.values():
+    if DB_POOL:
+        # The pool hands out and health-checks connections; Django must not keep its own
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS'] = {
+            **database.get('OPTIONS', {}),
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            },
+        }
+    else:
+        database['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+        database['CONN_HEALTH_CHECKS'] = True
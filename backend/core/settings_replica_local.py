@@ -0,0 +1,27 @@
+"""
+Local profile for trying read-replica routing with two SQLite files.
+
+    export DJANGO_SETTINGS_MODULE=core.settings_replica_local
+    python manage.py migrate
+    python manage.py migrate --database=replica
+    python manage.py runserver
+
+Writes land in primary.sqlite3 and anonymous GETs read replica.sqlite3, which
+never receives them, so routing is easy to see. Copy primary.sqlite3 over
+replica.sqlite3 to let the "replica" catch up.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'primary.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_REPLICAS = ['replica']
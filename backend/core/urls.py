@@ -18,9 +18,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('accounts.urls')),  # Authentication endpoints
     path('api/', include('api.urls')),  # API endpoints
+    path('metrics/', metrics_view, name='metrics'),  # Prometheus scrape endpoint
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,35 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from accounts.permissions import Capability, capabilities_for
+from .metrics import render_prometheus
+
+
+def _has_metrics_access(request):
+    """Allow the configured scrape token, or a logged-in admin."""
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token and header.startswith('Bearer '):
+        if hmac.compare_digest(header[len('Bearer '):].strip(), token):
+            return True
+
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return False
+    if result is None:
+        return False
+    user, _ = result
+    return Capability.METRICS_VIEW in capabilities_for(user)
+
+
+def metrics_view(request):
+    """Expose in-process metrics in Prometheus text format."""
+    if not _has_metrics_access(request):
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')